@@ -1,8 +1,69 @@
+from decimal import Decimal
+from functools import lru_cache
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.urls import reverse
-from django.db.models import Count, Sum
-from .models import PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnapshot
+from django.db.models import (
+    Case, Count, IntegerField, Sum, Value, When
+)
+from .models import (
+    PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnapshot,
+    RecentAnalyticsEvent, ENGAGEMENT_SCORE
+)
+
+# Indexed by threshold bucket: 0 below the low mark, 1 between, 2 above
+RATE_COLORS = ('red', 'orange', 'green')
+
+
+def _rate_color(value, low, high):
+    return RATE_COLORS[int(value >= low) + int(value >= high)]
+
+
+@lru_cache(maxsize=None)
+def _change_url_template(viewname):
+    # Resolve once per process; rows only differ by their primary key
+    return reverse(viewname, args=['__pk__'])
+
+
+def _change_url(viewname, pk):
+    return _change_url_template(viewname).replace('__pk__', str(pk))
+
+
+class LargeTablePaginator(Paginator):
+    """Paginator that avoids an exact COUNT(*) on very large tables
+
+    On PostgreSQL the planner's row estimate is used once it exceeds
+    ``estimate_threshold``; smaller result sets and other databases fall
+    back to the exact count.
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate > self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _estimated_count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return None
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        sql, params = query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
 
 
 @admin.register(PollAnalytics)
@@ -33,21 +94,25 @@ class PollAnalyticsAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False  # Analytics should not be manually modified
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'poll', 'poll__creator')
+
     def poll_link(self, obj):
-        url = reverse('admin:polls_poll_change', args=[obj.poll.id])
+        url = _change_url('admin:polls_poll_change', obj.poll_id)
         return format_html('<a href="{}">{}</a>', url, obj.poll.title)
     poll_link.short_description = 'Poll'
 
     def completion_rate(self, obj):
         rate = obj.completion_rate
-        color = 'green' if rate >= 70 else 'orange' if rate >= 40 else 'red'
-        return format_html('<span style="color: {};">{:.1f}%</span>', color, rate)
+        return format_html('<span style="color: {};">{}%</span>',
+                           _rate_color(rate, 40, 70), f'{rate:.1f}')
     completion_rate.short_description = 'Completion Rate'
 
     def view_to_vote_rate(self, obj):
         rate = obj.view_to_vote_rate
-        color = 'green' if rate >= 20 else 'orange' if rate >= 10 else 'red'
-        return format_html('<span style="color: {};">{:.1f}%</span>', color, rate)
+        return format_html('<span style="color: {};">{}%</span>',
+                           _rate_color(rate, 10, 20), f'{rate:.1f}')
     view_to_vote_rate.short_description = 'Conversion Rate'
 
 
@@ -79,23 +144,30 @@ class UserAnalyticsAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user').annotate(
+            engagement=ENGAGEMENT_SCORE
+        ).annotate(
+            engagement_bucket=Case(
+                When(engagement__gte=50, then=Value(2)),
+                When(engagement__gte=20, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        )
+
     def user_link(self, obj):
-        url = reverse('admin:core_user_change', args=[obj.user.id])
+        url = _change_url('admin:core_user_change', obj.user_id)
         return format_html('<a href="{}">{}</a>', url, obj.user.username)
     user_link.short_description = 'User'
 
     def engagement_score_display(self, obj):
-        # Calculate engagement score
-        score = (
-            obj.polls_created * 10 +
-            obj.total_votes_made * 2 +
-            obj.bookmarks_made * 1 +
-            obj.shares_made * 5
-        ) / 100.0
-
-        color = 'green' if score >= 50 else 'orange' if score >= 20 else 'red'
-        return format_html('<span style="color: {};">{:.1f}</span>', color, score)
+        # Score and color bucket are annotated by get_queryset
+        color = RATE_COLORS[obj.engagement_bucket]
+        return format_html('<span style="color: {};">{}</span>',
+                           color, f'{obj.engagement:.1f}')
     engagement_score_display.short_description = 'Engagement Score'
+    engagement_score_display.admin_order_field = 'engagement'
 
 
 @admin.register(AnalyticsEvent)
@@ -116,6 +188,8 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
     ]
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
+    paginator = LargeTablePaginator
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         return False
@@ -124,15 +198,15 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
         return False
 
     def user_link(self, obj):
-        if obj.user:
-            url = reverse('admin:core_user_change', args=[obj.user.id])
+        if obj.user_id:
+            url = _change_url('admin:core_user_change', obj.user_id)
             return format_html('<a href="{}">{}</a>', url, obj.user.username)
         return '-'
     user_link.short_description = 'User'
 
     def poll_link(self, obj):
-        if obj.poll:
-            url = reverse('admin:polls_poll_change', args=[obj.poll.id])
+        if obj.poll_id:
+            url = _change_url('admin:polls_poll_change', obj.poll_id)
             return format_html('<a href="{}">{}</a>', url, obj.poll.title)
         return '-'
     poll_link.short_description = 'Poll'
@@ -145,7 +219,8 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         # Only show events from last 30 days by default
         recent_date = timezone.now() - timedelta(days=30)
-        return qs.filter(created_at__gte=recent_date)
+        return qs.filter(created_at__gte=recent_date).select_related(
+            'user', 'poll')
 
 
 @admin.register(AnalyticsSnapshot)
@@ -187,7 +262,21 @@ class AnalyticsAdminSite:
         return urls
 
     def analytics_dashboard_view(self, request):
+        import time
         from django.shortcuts import render
+        from django.core.cache import cache
+
+        # The dashboard is identical for every admin, so share the computed
+        # context across requests within the same 5 minute window
+        cache_key = f'analytics:dash:{int(time.time() // 300)}'
+        context = cache.get(cache_key)
+        if context is None:
+            context = self._build_dashboard_context()
+            cache.set(cache_key, context, 300)
+
+        return render(request, 'admin/analytics_dashboard.html', context)
+
+    def _build_dashboard_context(self):
         from datetime import timedelta
         from django.utils import timezone
         from django.db.models import Count, Sum, Avg
@@ -199,34 +288,32 @@ class AnalyticsAdminSite:
         # Basic metrics
         total_polls = PollAnalytics.objects.count()
         total_users = UserAnalytics.objects.count()
-        total_events = AnalyticsEvent.objects.filter(
-            created_at__gte=start_date).count()
+        # 30-day event aggregates read the analytics_events_30d view
+        recent_events = RecentAnalyticsEvent.objects.order_by()
+        total_events = recent_events.count()
 
         # Revenue metrics
-        total_revenue = PollAnalytics.objects.aggregate(
-            total=Sum('total_revenue')
+        total_revenue_cents = PollAnalytics.objects.aggregate(
+            total=Sum('total_revenue_cents')
         )['total'] or 0
+        total_revenue = Decimal(total_revenue_cents) / 100
 
         # Top performing polls
-        top_polls = PollAnalytics.objects.select_related('poll').order_by(
-            '-total_votes'
-        )[:10]
+        top_polls = list(PollAnalytics.objects.select_related('poll').only(
+            'total_votes', 'total_revenue', 'poll__id', 'poll__title'
+        ).order_by('-total_votes')[:10])
 
         # Top countries
-        top_countries = AnalyticsEvent.objects.filter(
-            created_at__gte=start_date
-        ).values('country_code').annotate(
+        top_countries = list(recent_events.values('country_code').annotate(
             count=Count('id')
-        ).order_by('-count')[:10]
+        ).order_by('-count')[:10])
 
         # Event distribution
-        event_distribution = AnalyticsEvent.objects.filter(
-            created_at__gte=start_date
-        ).values('event_type').annotate(
+        event_distribution = list(recent_events.values('event_type').annotate(
             count=Count('id')
-        ).order_by('-count')
+        ).order_by('-count'))
 
-        context = {
+        return {
             'title': 'Analytics Dashboard',
             'total_polls': total_polls,
             'total_users': total_users,
@@ -237,5 +324,3 @@ class AnalyticsAdminSite:
             'event_distribution': event_distribution,
             'date_range': f"{start_date.date()} to {end_date.date()}"
         }
-
-        return render(request, 'admin/analytics_dashboard.html', context)
@@ -8,7 +8,4 @@ class AnalyticsConfig(AppConfig):
 
     def ready(self):
         """Import signals when the app is ready"""
-        try:
-            import apps.analytics.signals  # noqa
-        except ImportError:
-            pass
+        import apps.analytics.signals  # noqa
@@ -1,6 +1,37 @@
+from concurrent.futures import ProcessPoolExecutor
+import django
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.utils import timezone
-from apps.analytics.services import AnalyticsService
+
+# Number of poll/user IDs handed to each worker process at a time
+SHARD_SIZE = 500
+
+
+def _init_worker():
+    # Spawned workers start with no app registry; forked ones already
+    # have one, and setup() is a no-op for them
+    django.setup()
+    # Never share the parent's database sockets with a forked worker
+    connections.close_all()
+
+
+# The shard functions import models lazily: a spawned worker imports this
+# module to unpickle them before django.setup() has run
+
+def update_poll_shard(poll_ids):
+    from apps.analytics.services import AnalyticsService
+
+    service = AnalyticsService()
+    return len(poll_ids) if service.update_poll_analytics(
+        poll_ids=poll_ids) else 0
+
+
+def update_user_shard(user_ids):
+    from apps.analytics.services import AnalyticsService
+
+    service = AnalyticsService()
+    return sum(service.update_user_analytics(uid) for uid in user_ids)
 
 
 class Command(BaseCommand):
@@ -27,6 +58,13 @@ class Command(BaseCommand):
             action='store_true',
             help='Update analytics for all active users',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes for --all-polls/--all-users '
+                 '(default: 1; keep at 1 on SQLite, which has one writer)',
+        )
         parser.add_argument(
             '--create-snapshot',
             choices=['hourly', 'daily', 'weekly', 'monthly'],
@@ -37,8 +75,21 @@ class Command(BaseCommand):
             action='store_true',
             help='Clean up old analytics events',
         )
+        parser.add_argument(
+            '--refresh-recent-events',
+            action='store_true',
+            help='Refresh the 30-day analytics event view',
+        )
+        parser.add_argument(
+            '--refresh-geo-counts',
+            type=int,
+            metavar='DAYS',
+            help='Recount per-country daily event totals for the last DAYS days',
+        )
 
     def handle(self, *args, **options):
+        from apps.analytics.services import AnalyticsService
+
         analytics_service = AnalyticsService()
 
         try:
@@ -73,29 +124,41 @@ class Command(BaseCommand):
                     )
 
             elif options['all_polls']:
+                from apps.polls.models import Poll
+
                 self.stdout.write("Updating analytics for all active polls...")
-                success = analytics_service.update_poll_analytics()
-                if success:
+                poll_ids = list(Poll.objects.filter(
+                    is_active=True).values_list('id', flat=True))
+                updated = self._run_sharded(
+                    update_poll_shard, poll_ids, options['workers'])
+                if updated == len(poll_ids):
                     self.stdout.write(
                         self.style.SUCCESS(
                             'Successfully updated all poll analytics')
                     )
                 else:
                     self.stdout.write(
-                        self.style.ERROR('Failed to update poll analytics')
+                        self.style.ERROR(
+                            f'Failed to update analytics for '
+                            f'{len(poll_ids) - updated} polls')
                     )
 
             elif options['all_users']:
                 self.stdout.write("Updating analytics for all active users...")
-                success = analytics_service.update_user_analytics()
-                if success:
+                user_ids = list(analytics_service.get_recently_active_users(
+                ).values_list('id', flat=True))
+                updated = self._run_sharded(
+                    update_user_shard, user_ids, options['workers'])
+                if updated == len(user_ids):
                     self.stdout.write(
                         self.style.SUCCESS(
                             'Successfully updated all user analytics')
                     )
                 else:
                     self.stdout.write(
-                        self.style.ERROR('Failed to update user analytics')
+                        self.style.ERROR(
+                            f'Failed to update analytics for '
+                            f'{len(user_ids) - updated} users')
                     )
 
             elif options['create_snapshot']:
@@ -124,15 +187,44 @@ class Command(BaseCommand):
                     settings, 'ANALYTICS_RETENTION_DAYS', 365)
                 cutoff_date = timezone.now() - timedelta(days=retention_days)
 
+                # Monthly partitions that are entirely expired are dropped
+                # outright; only the partition straddling the cutoff (or the
+                # whole table, when it isn't partitioned) needs row deletes
+                for partition in AnalyticsEvent.objects.drop_partitions_before(
+                        cutoff_date):
+                    self.stdout.write(f"Dropped partition {partition}")
+
+                # Delete in bounded batches so no single statement holds
+                # locks on the events table for long. Nothing references
+                # AnalyticsEvent, so the raw deletes skip the collector safely.
                 deleted_count = AnalyticsEvent.objects.filter(
                     created_at__lt=cutoff_date
-                ).delete()[0]
+                ).delete_in_batches()
 
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'Cleaned up {deleted_count} old analytics events')
                 )
 
+            elif options['refresh_recent_events']:
+                from apps.analytics.models import RecentAnalyticsEvent
+
+                self.stdout.write("Refreshing 30-day analytics event view...")
+                RecentAnalyticsEvent.objects.refresh()
+                self.stdout.write(
+                    self.style.SUCCESS('Refreshed 30-day analytics event view')
+                )
+
+            elif options['refresh_geo_counts']:
+                from apps.analytics.models import GeoDailyCount
+
+                rows = GeoDailyCount.objects.refresh(
+                    options['refresh_geo_counts'])
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Refreshed {rows} per-country daily event totals')
+                )
+
             else:
                 self.stdout.write(
                     self.style.WARNING(
@@ -141,3 +233,15 @@ class Command(BaseCommand):
 
         except Exception as e:
             raise CommandError(f'Analytics update failed: {str(e)}')
+
+    def _run_sharded(self, func, ids, workers):
+        """Run func over SHARD_SIZE slices of ids; returns the success count"""
+        shards = [ids[i:i + SHARD_SIZE] for i in range(0, len(ids), SHARD_SIZE)]
+        if workers <= 1 or len(shards) <= 1:
+            return sum(func(shard) for shard in shards)
+
+        # Workers open their own connections on first query
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker) as executor:
+            return sum(executor.map(func, shards))
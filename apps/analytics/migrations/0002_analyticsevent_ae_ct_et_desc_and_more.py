@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('polls', '0004_alter_bookmark_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['-created_at', 'event_type'], name='ae_ct_et_desc'),
+        ),
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['-created_at', 'country_code'], name='ae_ct_cc_desc'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_analyticsevent_ae_ct_et_desc_and_more'),
+        ('polls', '0004_alter_bookmark_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PollTimeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('country', 'Country'), ('platform', 'Platform')], max_length=10)),
+                ('key', models.CharField(max_length=32)),
+                ('count', models.BigIntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_buckets', to='polls.poll')),
+            ],
+            options={
+                'verbose_name': 'Poll Time Bucket',
+                'verbose_name_plural': 'Poll Time Buckets',
+                'indexes': [models.Index(fields=['poll', 'kind', '-count'], name='ptb_poll_kind_count')],
+                'unique_together': {('poll', 'kind', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:35
+
+from django.db import migrations, models
+
+
+VIEW_COLUMNS = (
+    'id, event_type, country_code, device_type, created_at, poll_id, user_id'
+)
+
+WINDOW_START = {
+    'postgresql': "now() - interval '30 days'",
+    'mysql': 'UTC_TIMESTAMP() - INTERVAL 30 DAY',
+    'sqlite': "datetime('now', '-30 days')",
+}
+
+
+def create_view(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    select = (
+        f'SELECT {VIEW_COLUMNS} FROM analytics_analyticsevent '
+        f'WHERE created_at >= {WINDOW_START.get(vendor, WINDOW_START["postgresql"])}'
+    )
+    if vendor == 'postgresql':
+        # The unique index is what allows REFRESH ... CONCURRENTLY
+        schema_editor.execute(
+            f'CREATE MATERIALIZED VIEW analytics_events_30d AS {select}')
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX ae30d_id ON analytics_events_30d (id)')
+        schema_editor.execute(
+            'CREATE INDEX ae30d_event_type ON analytics_events_30d (event_type)')
+        schema_editor.execute(
+            'CREATE INDEX ae30d_country_code ON analytics_events_30d (country_code)')
+    else:
+        schema_editor.execute(f'CREATE VIEW analytics_events_30d AS {select}')
+
+
+def drop_view(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP MATERIALIZED VIEW IF EXISTS analytics_events_30d')
+    else:
+        schema_editor.execute('DROP VIEW IF EXISTS analytics_events_30d')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_polltimebucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecentAnalyticsEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('poll_view', 'Poll Viewed'), ('poll_vote', 'Poll Vote'), ('poll_share', 'Poll Shared'), ('poll_bookmark', 'Poll Bookmarked'), ('user_register', 'User Registration'), ('user_login', 'User Login'), ('payment_made', 'Payment Made'), ('export_data', 'Data Export')], max_length=50)),
+                ('country_code', models.CharField(blank=True, max_length=2)),
+                ('device_type', models.CharField(choices=[('mobile', 'Mobile'), ('desktop', 'Desktop'), ('tablet', 'Tablet'), ('unknown', 'Unknown')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Recent Analytics Event',
+                'verbose_name_plural': 'Recent Analytics Events',
+                'db_table': 'analytics_events_30d',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_view, drop_view),
+    ]
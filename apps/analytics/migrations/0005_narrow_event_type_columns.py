@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:39
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# The 30-day view selects both columns, and neither PostgreSQL nor
+# SQLite's table rebuild will alter a column a view depends on
+events_30d = import_module(
+    'apps.analytics.migrations.0004_analytics_events_30d')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_analytics_events_30d'),
+    ]
+
+    operations = [
+        migrations.RunPython(events_30d.drop_view, events_30d.create_view),
+        migrations.AlterField(
+            model_name='analyticsevent',
+            name='device_type',
+            field=models.CharField(choices=[('mobile', 'Mobile'), ('desktop', 'Desktop'), ('tablet', 'Tablet'), ('unknown', 'Unknown')], default='unknown', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='analyticsevent',
+            name='event_type',
+            field=models.CharField(choices=[('poll_view', 'Poll Viewed'), ('poll_vote', 'Poll Vote'), ('poll_share', 'Poll Shared'), ('poll_bookmark', 'Poll Bookmarked'), ('user_register', 'User Registration'), ('user_login', 'User Login'), ('payment_made', 'Payment Made'), ('export_data', 'Data Export')], max_length=20),
+        ),
+        migrations.RunPython(events_30d.create_view, events_30d.drop_view),
+    ]
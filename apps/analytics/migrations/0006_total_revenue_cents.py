@@ -0,0 +1,39 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:40
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast, Round
+
+
+def backfill_cents(apps, schema_editor):
+    cents = Cast(Round(F('total_revenue') * 100), BigIntegerField())
+    for model_name in ('PollAnalytics', 'UserAnalytics', 'AnalyticsSnapshot'):
+        model = apps.get_model('analytics', model_name)
+        model.objects.using(schema_editor.connection.alias).update(
+            total_revenue_cents=cents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_narrow_event_type_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticssnapshot',
+            name='total_revenue_cents',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pollanalytics',
+            name='total_revenue_cents',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='useranalytics',
+            name='total_revenue_cents',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_cents, migrations.RunPython.noop),
+    ]
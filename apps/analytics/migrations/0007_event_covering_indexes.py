@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_total_revenue_cents'),
+        ('polls', '0005_vote_poll'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='analyticsevent',
+            name='analytics_a_poll_id_70cdb8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['poll', 'event_type', 'created_at'], name='ae_poll_evt_ts'),
+        ),
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['user', 'created_at'], name='ae_user_ts'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:52
+
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_event_covering_indexes'),
+        ('polls', '0005_vote_poll'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(models.F('user'), django.db.models.functions.datetime.ExtractHour('created_at'), name='ae_user_hour'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:02
+
+from django.db import migrations, models
+
+
+def backfill_summary_columns(apps, schema_editor):
+    PollAnalytics = apps.get_model('analytics', 'PollAnalytics')
+    manager = PollAnalytics.objects.using(schema_editor.connection.alias)
+
+    batch = []
+    for analytics in manager.only(
+            'id', 'top_countries', 'votes_by_hour').iterator(chunk_size=500):
+        analytics.top_country = (analytics.top_countries or ['XX'])[0][:2]
+        votes_by_hour = analytics.votes_by_hour or {}
+        peak_hour = max(votes_by_hour, key=votes_by_hour.get) \
+            if votes_by_hour else '12'
+        analytics.peak_voting_hour = \
+            int(peak_hour) if peak_hour.isdigit() else 12
+        batch.append(analytics)
+        if len(batch) == 500:
+            manager.bulk_update(batch, ['top_country', 'peak_voting_hour'])
+            batch = []
+    if batch:
+        manager.bulk_update(batch, ['top_country', 'peak_voting_hour'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_tablecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pollanalytics',
+            name='peak_voting_hour',
+            field=models.PositiveSmallIntegerField(default=12),
+        ),
+        migrations.AddField(
+            model_name='pollanalytics',
+            name='top_country',
+            field=models.CharField(default='XX', max_length=2),
+        ),
+        migrations.RunPython(
+            backfill_summary_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:30
+
+from django.db import migrations
+
+
+def create_brin_index(apps, schema_editor):
+    # Events are appended in created_at order, so a BRIN index prunes the
+    # 30-day window and retention deletes for a fraction of a B-tree's size
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS ae_created_at_brin '
+            'ON analytics_analyticsevent USING brin (created_at)')
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS ae_created_at_brin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_poll_summary_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-16 00:10
+
+from importlib import import_module
+
+from django.db import migrations
+
+from apps.core.partitions import rebuild_table
+
+
+TABLE = 'analytics_analyticsevent'
+
+# The 30-day view selects from the event table and has to be rebuilt
+recent_events_view = import_module(
+    'apps.analytics.migrations.0004_analytics_events_30d')
+
+
+def _rebuild_events(schema_editor, partitioned):
+    recent_events_view.drop_view(None, schema_editor)
+    rebuild_table(schema_editor, TABLE, partitioned=partitioned)
+    recent_events_view.create_view(None, schema_editor)
+
+
+def partition_events(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        _rebuild_events(schema_editor, partitioned=True)
+
+
+def unpartition_events(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        _rebuild_events(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0011_event_created_at_brin'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_events, unpartition_events),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_creator(apps, schema_editor):
+    PollAnalytics = apps.get_model('analytics', 'PollAnalytics')
+    Poll = apps.get_model('polls', 'Poll')
+    PollAnalytics.objects.using(schema_editor.connection.alias).update(
+        creator_id=models.Subquery(
+            Poll.objects.filter(pk=models.OuterRef('poll_id')).values(
+                'creator_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0012_partition_analytics_events'),
+        ('polls', '0005_vote_poll'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pollanalytics',
+            name='creator',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_creator, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pollanalytics',
+            index=models.Index(fields=['creator', '-last_updated'], name='pa_creator_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='pollanalytics',
+            index=models.Index(fields=['creator', '-total_votes'], name='pa_creator_votes'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0013_pollanalytics_creator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('country_code', models.CharField(blank=True, max_length=2)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Geo Daily Count',
+                'verbose_name_plural': 'Geo Daily Counts',
+                'unique_together': {('day', 'country_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.0.7 on 2026-10-16 00:06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0014_geodailycount'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='PollTimeBucket',
+        ),
+    ]
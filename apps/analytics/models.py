@@ -1,12 +1,47 @@
-from django.db import models
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connections, models
+from django.apps import apps as django_apps
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db.models import JSONField
+from django.db.models import (
+    Count, ExpressionWrapper, F, FloatField, JSONField, Q, Sum
+)
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate
+
+from apps.core.partitions import MonthlyPartitionManager
+from apps.core.querysets import BatchDeleteQuerySet, upsert_unique_fields
 
 User = get_user_model()
 
+Transaction = None
+if django_apps.is_installed('apps.payments'):
+    try:
+        from apps.payments.models import Transaction
+    except ImportError:
+        pass
+
+
+class RevenueCentsMixin:
+    """Keep total_revenue_cents in step with the Decimal total_revenue"""
 
-class PollAnalytics(models.Model):
+    def sync_revenue_cents(self):
+        # Integer cents are what the aggregate queries sum over
+        self.total_revenue_cents = int(
+            Decimal(str(self.total_revenue or 0)).quantize(Decimal('0.01')) * 100
+        )
+
+    def save(self, *args, **kwargs):
+        self.sync_revenue_cents()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'total_revenue' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'total_revenue_cents'}
+        super().save(*args, **kwargs)
+
+
+class PollAnalytics(RevenueCentsMixin, models.Model):
     """Aggregated analytics data for polls"""
 
     poll = models.OneToOneField(
@@ -14,6 +49,16 @@ class PollAnalytics(models.Model):
         on_delete=models.CASCADE,
         related_name='analytics'
     )
+    # Copy of poll.creator so creator-scoped lists skip the join; the
+    # composite indexes below lead with it
+    creator = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='+'
+    )
 
     # Basic metrics
     total_votes = models.IntegerField(default=0)
@@ -31,10 +76,12 @@ class PollAnalytics(models.Model):
     # Geographic distribution
     votes_by_country = JSONField(default=dict)  # {'US': 100, 'CA': 50, ...}
     top_countries = JSONField(default=list)  # ['US', 'CA', 'UK', ...]
+    top_country = models.CharField(max_length=2, default='XX')
 
     # Time-series data (last 30 days)
     # {'0': 10, '1': 5, ...} (24 hours)
     votes_by_hour = JSONField(default=dict)
+    peak_voting_hour = models.PositiveSmallIntegerField(default=12)
     # {'2024-01-01': 100, ...} (30 days)
     votes_by_day = JSONField(default=dict)
 
@@ -45,6 +92,7 @@ class PollAnalytics(models.Model):
     # Revenue metrics (for paid polls)
     total_revenue = models.DecimalField(
         max_digits=10, decimal_places=2, default=0)
+    total_revenue_cents = models.BigIntegerField(default=0)
     avg_revenue_per_vote = models.DecimalField(
         max_digits=8, decimal_places=2, default=0)
 
@@ -64,6 +112,10 @@ class PollAnalytics(models.Model):
             models.Index(fields=['last_updated']),
             models.Index(fields=['total_votes']),
             models.Index(fields=['completion_rate']),
+            models.Index(fields=['creator', '-last_updated'],
+                         name='pa_creator_updated'),
+            models.Index(fields=['creator', '-total_votes'],
+                         name='pa_creator_votes'),
         ]
 
     def __str__(self):
@@ -71,42 +123,223 @@ class PollAnalytics(models.Model):
 
     def update_basic_metrics(self):
         """Update basic analytics metrics"""
-        from apps.polls.models import Vote, VoteSession
-
-        # Calculate total votes and unique voters
-        self.total_votes = Vote.objects.filter(
-            choice__question__poll=self.poll
-        ).count()
-
+        self.calculate_basic_metrics()
+        # Leave the JSON distribution columns out of the UPDATE
+        self.save(update_fields=[
+            'total_votes', 'unique_voters', 'completion_rate',
+            'bookmark_count', 'share_count', 'top_countries', 'top_country',
+            'peak_voting_hour', 'last_calculated', 'last_updated',
+        ])
+
+    def sync_summary_fields(self):
+        """Derive top_country and peak_voting_hour from the distributions"""
+        self.top_country = self.top_countries[0] if self.top_countries else 'XX'
+
+        votes_by_hour = self.votes_by_hour or {}
+        peak_hour = max(votes_by_hour, key=votes_by_hour.get) \
+            if votes_by_hour else '12'
+        self.peak_voting_hour = int(peak_hour) if peak_hour.isdigit() else 12
+
+    @staticmethod
+    def get_vote_stats(poll, required_questions):
+        """Total votes and voters who answered every required question"""
+        from apps.polls.models import Vote
+
+        # Both numbers in one pass: group the poll's votes per voter and
+        # count the required questions each voter answered
+        return Vote.objects.filter(
+            poll=poll
+        ).values('ip_address').annotate(
+            votes_cast=Count('id'),
+            required_answered=Count(
+                'choice__question',
+                filter=Q(choice__question__is_required=True),
+                distinct=True
+            )
+        ).aggregate(
+            total=Sum('votes_cast'),
+            completed=Count(
+                'ip_address',
+                filter=Q(required_answered__gte=required_questions)
+            )
+        )
+
+    @staticmethod
+    def get_completed_voters(poll_required):
+        """Voters who answered every required question, per poll
+
+        poll_required maps poll id to its required question count. One
+        GROUP BY (poll, voter) over the votes on required questions.
+        """
+        from apps.polls.models import Vote
+
+        answered = Vote.objects.filter(
+            poll_id__in=[pid for pid, required in poll_required.items()
+                         if required],
+            choice__question__is_required=True
+        ).values('poll_id', 'ip_address').annotate(
+            required_answered=Count('choice__question', distinct=True)
+        ).order_by().values_list('poll_id', 'required_answered')
+
+        completed = {}
+        for poll_id, required_answered in answered:
+            if required_answered >= poll_required[poll_id]:
+                completed[poll_id] = completed.get(poll_id, 0) + 1
+        return completed
+
+    def calculate_basic_metrics(self):
+        """Recompute vote, voter, completion and engagement counters"""
+        from apps.polls.models import VoteSession
+
+        required_questions = self.poll.questions.filter(
+            is_required=True).count()
+
+        vote_stats = self.get_vote_stats(self.poll, required_questions)
+        self.total_votes = vote_stats['total'] or 0
+
+        # Sessions are unique per (poll, ip_address), so each row is a
+        # distinct (user, ip_address) voter and no DISTINCT is needed
         self.unique_voters = VoteSession.objects.filter(
-            poll=self.poll
-        ).values('user', 'ip_address').distinct().count()
+            poll=self.poll).count()
 
         # Calculate completion rate
-        if self.unique_voters > 0:
-            required_questions = self.poll.questions.filter(
-                is_required=True).count()
-            if required_questions > 0:
-                from django.db.models import Count
-                completed_sessions = VoteSession.objects.annotate(
-                    votes_count=Count('votes')
-                ).filter(
-                    poll=self.poll,
-                    votes_count__gte=required_questions
-                ).count()
-
-                self.completion_rate = (
-                    completed_sessions / self.unique_voters) * 100
+        if self.unique_voters > 0 and required_questions > 0:
+            completed_sessions = vote_stats['completed'] or 0
+            self.completion_rate = (
+                completed_sessions / self.unique_voters) * 100
 
         # Update bookmarks and shares
         self.bookmark_count = self.poll.bookmarks.count()
         self.share_count = self.poll.shares.count()
 
+        votes_by_country = self.votes_by_country or {}
+        self.top_countries = sorted(
+            votes_by_country, key=votes_by_country.get, reverse=True)[:10]
+        self.sync_summary_fields()
+
         self.last_calculated = timezone.now()
-        self.save()
 
 
-class UserAnalytics(models.Model):
+class TableCounterManager(models.Manager):
+    # Counter name -> model whose rows it counts
+    SOURCES = {
+        'users': User._meta.label,
+        'polls': 'polls.Poll',
+        'votes': 'polls.Vote',
+    }
+
+    def increment(self, name, delta=1):
+        """Shift a counter by delta, seeding it from COUNT(*) on first use"""
+        if not self.filter(name=name).update(value=F('value') + delta):
+            self.reconcile([name])
+
+    def current(self):
+        """All counters in one query, seeding any that are missing"""
+        counts = dict(self.values_list('name', 'value'))
+        missing = [name for name in self.SOURCES if name not in counts]
+        if missing:
+            counts.update(self.reconcile(missing))
+        return counts
+
+    def reconcile(self, names=None):
+        """Reset counters from COUNT(*) of their tables"""
+        counts = {
+            name: django_apps.get_model(self.SOURCES[name]).objects.count()
+            for name in names or self.SOURCES
+        }
+
+        unique_fields = upsert_unique_fields(connections[self.db], ['name'])
+
+        self.bulk_create(
+            [self.model(name=name, value=value)
+             for name, value in counts.items()],
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['value']
+        )
+        return counts
+
+
+class TableCounter(models.Model):
+    """Running row counts of large tables, read by snapshots"""
+
+    name = models.CharField(max_length=32, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    objects = TableCounterManager()
+
+    class Meta:
+        verbose_name = "Table Counter"
+        verbose_name_plural = "Table Counters"
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class GeoDailyCountManager(models.Manager):
+    def refresh(self, days=2):
+        """Recount the events of the last `days` days per country
+
+        Rows for those days are replaced, not incremented, so rerunning
+        over a day that is still filling up is safe.
+        """
+        since = timezone.localdate() - timedelta(days=days - 1)
+        counts = AnalyticsEvent.objects.filter(
+            created_at__gte=timezone.make_aware(datetime.combine(since, time.min))
+        ).annotate(
+            day=TruncDate('created_at')
+        ).values('day', 'country_code').annotate(
+            count=Count('id')
+        ).order_by()
+
+        unique_fields = upsert_unique_fields(
+            connections[self.db], ['day', 'country_code'])
+
+        rows = [self.model(**row) for row in counts]
+        self.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['count']
+        )
+        return len(rows)
+
+    def distribution(self, since, limit=10):
+        """Event counts per country from `since` (a date), busiest first"""
+        rows = self.filter(day__gte=since).values('country_code').annotate(
+            total=Sum('count')
+        ).order_by('-total')[:limit]
+        return {row['country_code']: row['total'] for row in rows}
+
+
+class GeoDailyCount(models.Model):
+    """Events per country per day, rolled up hourly from AnalyticsEvent"""
+
+    day = models.DateField()
+    country_code = models.CharField(max_length=2, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    objects = GeoDailyCountManager()
+
+    class Meta:
+        verbose_name = "Geo Daily Count"
+        verbose_name_plural = "Geo Daily Counts"
+        unique_together = ('day', 'country_code')
+
+    def __str__(self):
+        return f"{self.day} {self.country_code or '??'} = {self.count}"
+
+
+# Weighted activity score, annotated by the leaderboard and the admin
+ENGAGEMENT_SCORE = ExpressionWrapper(
+    (F('polls_created') * 10 + F('total_votes_made') * 2 +
+     F('bookmarks_made') + F('shares_made') * 5) / 100.0,
+    output_field=FloatField()
+)
+
+
+class UserAnalytics(RevenueCentsMixin, models.Model):
     """Aggregated analytics data for users"""
 
     user = models.OneToOneField(
@@ -134,6 +367,7 @@ class UserAnalytics(models.Model):
     # Revenue metrics (for paid features)
     total_revenue = models.DecimalField(
         max_digits=10, decimal_places=2, default=0)
+    total_revenue_cents = models.BigIntegerField(default=0)
     total_spent = models.DecimalField(
         max_digits=10, decimal_places=2, default=0)
 
@@ -163,47 +397,75 @@ class UserAnalytics(models.Model):
     def update_metrics(self):
         """Update user analytics metrics"""
         from apps.polls.models import Vote, VoteSession
-        from apps.payments.models import Transaction
 
         # Poll creation metrics
-        user_polls = self.user.polls.all()
-        self.polls_created = user_polls.count()
-        self.active_polls = user_polls.filter(is_active=True).count()
+        poll_stats = self.user.polls.aggregate(
+            created=Count('id'),
+            active=Count('id', filter=Q(is_active=True))
+        )
+        self.polls_created = poll_stats['created']
+        self.active_polls = poll_stats['active']
 
         # Voting metrics
         self.polls_voted = VoteSession.objects.filter(
-            user=self.user).values('poll').distinct().count()
-        self.total_votes_made = Vote.objects.filter(
-            choice__question__poll__vote_sessions__user=self.user
-        ).count()
-
-        # Calculate votes received on user's polls
-        self.total_votes_received = Vote.objects.filter(
-            choice__question__poll__creator=self.user
-        ).count()
+            user=self.user
+        ).aggregate(polls_voted=Count('poll', distinct=True))['polls_voted']
+
+        # Votes made on polls the user took part in, and votes received on
+        # the user's own polls, in a single pass over Vote
+        made_filter = Q(poll__vote_sessions__user=self.user)
+        received_filter = Q(poll__creator=self.user)
+        vote_stats = Vote.objects.filter(
+            made_filter | received_filter
+        ).aggregate(
+            made=Count('id', filter=made_filter, distinct=True),
+            received=Count('id', filter=received_filter, distinct=True)
+        )
+        self.total_votes_made = vote_stats['made']
+        self.total_votes_received = vote_stats['received']
 
         # Engagement metrics
         self.bookmarks_made = self.user.bookmarks.count()
         self.shares_made = self.user.shares.count()
 
-        # Revenue metrics (if payments app exists)
-        try:
-            revenue_transactions = Transaction.objects.filter(
-                poll__creator=self.user,
-                status='completed'
-            )
-            self.total_revenue = sum(t.amount for t in revenue_transactions)
-
-            spent_transactions = Transaction.objects.filter(
-                user=self.user,
-                status='completed'
+        # Revenue earned and spent, in a single pass over Transaction
+        if Transaction is not None:
+            earned_filter = Q(poll__creator=self.user)
+            spent_filter = Q(user=self.user)
+            revenue = Transaction.objects.filter(
+                earned_filter | spent_filter, status='completed'
+            ).aggregate(
+                earned=Sum('amount', filter=earned_filter),
+                spent=Sum('amount', filter=spent_filter)
             )
-            self.total_spent = sum(t.amount for t in spent_transactions)
-        except:
-            pass
+            self.total_revenue = revenue['earned'] or 0
+            self.total_spent = revenue['spent'] or 0
+
+        # Activity patterns: the busiest bucket of the user's events
+        events = AnalyticsEvent.objects.filter(user=self.user)
+        self.most_active_hour = self._busiest(
+            events.annotate(bucket=ExtractHour('created_at')), 12)
+        self.most_active_day = self._busiest(
+            events.annotate(bucket=ExtractIsoWeekDay('created_at')), 1)
+        self.primary_country = self._busiest(
+            events.annotate(bucket=F('country_code')), '')
 
         self.last_calculated = timezone.now()
-        self.save()
+        self.save(update_fields=[
+            'polls_created', 'active_polls', 'polls_voted',
+            'total_votes_made', 'total_votes_received', 'bookmarks_made',
+            'shares_made', 'total_revenue', 'total_spent',
+            'most_active_hour', 'most_active_day', 'primary_country',
+            'last_calculated', 'last_updated',
+        ])
+
+    @staticmethod
+    def _busiest(events, default):
+        """Most frequent value of the events' bucket annotation"""
+        busiest = events.values('bucket').annotate(
+            count=Count('id')
+        ).order_by('-count').first()
+        return busiest['bucket'] if busiest else default
 
 
 class AnalyticsEvent(models.Model):
@@ -228,7 +490,7 @@ class AnalyticsEvent(models.Model):
     )
 
     # Core event data
-    event_type = models.CharField(max_length=50, choices=EVENT_TYPES)
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
     user = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -250,7 +512,7 @@ class AnalyticsEvent(models.Model):
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField(blank=True)
     device_type = models.CharField(
-        max_length=20, choices=DEVICE_TYPES, default='unknown')
+        max_length=10, choices=DEVICE_TYPES, default='unknown')
 
     # Geographic data
     country_code = models.CharField(max_length=2, blank=True)
@@ -263,23 +525,149 @@ class AnalyticsEvent(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = MonthlyPartitionManager.from_queryset(BatchDeleteQuerySet)()
+
     class Meta:
         verbose_name = "Analytics Event"
         verbose_name_plural = "Analytics Events"
         indexes = [
             models.Index(fields=['event_type', 'created_at']),
             models.Index(fields=['user', 'event_type']),
-            models.Index(fields=['poll', 'event_type']),
+            # Covers the per-poll rollups, which also bound created_at
+            models.Index(fields=['poll', 'event_type', 'created_at'],
+                         name='ae_poll_evt_ts'),
+            models.Index(fields=['user', 'created_at'], name='ae_user_ts'),
+            models.Index(F('user'), ExtractHour('created_at'),
+                         name='ae_user_hour'),
             models.Index(fields=['country_code', 'created_at']),
             models.Index(fields=['device_type', 'created_at']),
+            # Dashboard queries filter on a time range first, then group
+            models.Index(fields=['-created_at', 'event_type'],
+                         name='ae_ct_et_desc'),
+            models.Index(fields=['-created_at', 'country_code'],
+                         name='ae_ct_cc_desc'),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return f"{self.event_type} - {self.ip_address} - {self.created_at}"
 
+    # Columns written by copy_log, in COPY order
+    COPY_COLUMNS = (
+        'event_type', 'user_id', 'poll_id', 'ip_address', 'user_agent',
+        'device_type', 'country_code', 'region', 'city', 'metadata',
+        'created_at',
+    )
+
+    @classmethod
+    def clear_missing_refs(cls, events):
+        """Null out user_id/poll_id values whose rows no longer exist
+
+        Buffered events carry bare ids, and one dangling reference would
+        otherwise fail the whole batch insert.
+        """
+        for field in ('user', 'poll'):
+            attname = cls._meta.get_field(field).attname
+            ids = {event[attname] for event in events if event.get(attname)}
+            if not ids:
+                continue
+            existing = set(
+                cls._meta.get_field(field).related_model.objects.filter(
+                    pk__in=ids).values_list('pk', flat=True)
+            )
+            for event in events:
+                if event.get(attname) and event[attname] not in existing:
+                    event[attname] = None
+        return events
+
+    @classmethod
+    def bulk_log(cls, events):
+        """Insert many events (dicts of field values) in batched INSERTs"""
+        return cls.objects.bulk_create(
+            [cls(**event) for event in events],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def copy_log(cls, events, using='default'):
+        """Stream events through COPY FROM STDIN on PostgreSQL"""
+        connection = connections[using]
+        if connection.vendor != 'postgresql':
+            return cls.bulk_log(events)
+
+        now = timezone.now()
+        rows = []
+        for event in events:
+            obj = cls(**event)
+            obj.metadata = json.dumps(obj.metadata)
+            obj.created_at = obj.created_at or now
+            rows.append(tuple(getattr(obj, column)
+                        for column in cls.COPY_COLUMNS))
+
+        quote = connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            quote(cls._meta.db_table),
+            ', '.join(quote(column) for column in cls.COPY_COLUMNS)
+        )
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        return len(rows)
+
+
+class RecentAnalyticsEventManager(models.Manager):
+    def refresh(self):
+        """Rebuild the 30-day window; plain views elsewhere are always live"""
+        connection = connections[self.db]
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'REFRESH MATERIALIZED VIEW CONCURRENTLY '
+                f'{connection.ops.quote_name(self.model._meta.db_table)}'
+            )
+
+
+class RecentAnalyticsEvent(models.Model):
+    """Read-only view over the last 30 days of AnalyticsEvent rows"""
+
+    event_type = models.CharField(
+        max_length=20, choices=AnalyticsEvent.EVENT_TYPES)
+    country_code = models.CharField(max_length=2, blank=True)
+    device_type = models.CharField(
+        max_length=10, choices=AnalyticsEvent.DEVICE_TYPES)
+    created_at = models.DateTimeField()
+    poll = models.ForeignKey(
+        'polls.Poll',
+        on_delete=models.DO_NOTHING,
+        null=True,
+        db_constraint=False,
+        related_name='+'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        db_constraint=False,
+        related_name='+'
+    )
+
+    objects = RecentAnalyticsEventManager()
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_events_30d'
+        verbose_name = "Recent Analytics Event"
+        verbose_name_plural = "Recent Analytics Events"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.event_type} - {self.created_at}"
+
 
-class AnalyticsSnapshot(models.Model):
+class AnalyticsSnapshot(RevenueCentsMixin, models.Model):
     """Daily/hourly snapshots for trend analysis"""
 
     SNAPSHOT_TYPES = (
@@ -303,6 +691,7 @@ class AnalyticsSnapshot(models.Model):
     # Revenue metrics
     total_revenue = models.DecimalField(
         max_digits=12, decimal_places=2, default=0)
+    total_revenue_cents = models.BigIntegerField(default=0)
     new_revenue = models.DecimalField(
         max_digits=10, decimal_places=2, default=0)
 
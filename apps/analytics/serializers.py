@@ -5,7 +5,19 @@ from .models import PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnaps
 User = get_user_model()
 
 
-class PollAnalyticsSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """Joins the relations read by dotted sources, avoiding a query per row"""
+
+    select_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related(*cls.select_related_fields)
+
+
+class PollAnalyticsSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('poll__creator',)
+
     poll_title = serializers.CharField(source='poll.title', read_only=True)
     poll_creator = serializers.CharField(
         source='poll.creator.username', read_only=True)
@@ -25,7 +37,32 @@ class PollAnalyticsSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class UserAnalyticsSerializer(serializers.ModelSerializer):
+# JSON distributions that can grow to tens of KB per poll
+POLL_DISTRIBUTION_FIELDS = (
+    'votes_by_country', 'votes_by_hour', 'votes_by_day', 'votes_by_platform',
+)
+
+
+class PollAnalyticsListSerializer(PollAnalyticsSerializer):
+    """Poll analytics without the per-bucket distributions, for lists"""
+
+    class Meta(PollAnalyticsSerializer.Meta):
+        fields = [
+            field for field in PollAnalyticsSerializer.Meta.fields
+            if field not in POLL_DISTRIBUTION_FIELDS
+        ]
+        read_only_fields = fields
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        # Leave the JSON columns in the table as well as out of the payload
+        return super().setup_eager_loading(queryset).defer(
+            *POLL_DISTRIBUTION_FIELDS)
+
+
+class UserAnalyticsSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('user',)
+
     username = serializers.CharField(source='user.username', read_only=True)
     user_email = serializers.EmailField(source='user.email', read_only=True)
     user_date_joined = serializers.DateTimeField(
@@ -43,7 +80,9 @@ class UserAnalyticsSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class AnalyticsEventSerializer(serializers.ModelSerializer):
+class AnalyticsEventSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('user', 'poll')
+
     username = serializers.CharField(source='user.username', read_only=True)
     poll_title = serializers.CharField(source='poll.title', read_only=True)
 
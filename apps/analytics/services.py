@@ -1,14 +1,82 @@
+import json
 import logging
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from typing import Dict, Any, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import (
+    InterfaceError, OperationalError, transaction
+)
 from django.utils import timezone
-from django.db.models import Count, Sum, Avg, Q
+from django.db.models import (
+    Count, Exists, OuterRef, Sum, Avg, Q
+)
 from django.contrib.auth import get_user_model
-from .models import PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnapshot
+from apps.core.writers import BatchWriter, write_rows
+from .models import (
+    PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnapshot,
+    TableCounter, Transaction
+)
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# A poll's real-time counters are refreshed at most once per window
+REALTIME_DEBOUNCE_SECONDS = 5
+REALTIME_PENDING_KEY = 'poll_rt:{poll_id}'
+
+# Cached per-poll counters, kept current by the signal handlers
+POLL_COUNTER_KEY = 'poll:{poll_id}:{counter}'
+POLL_COUNTERS = ('votes', 'views', 'bookmarks', 'shares')
+
+# Redis list that buffers tracked events until the flush task COPYs them
+EVENT_BUFFER_KEY = 'pollarize:analytics_events'
+EVENT_BUFFER_BATCH_SIZE = 5000
+
+# Buffered events that failed to insert on their own, kept for inspection
+EVENT_DEAD_LETTER_KEY = 'pollarize:analytics_events:failed'
+
+# Events tracked outside a request (signals, tasks) have no client IP;
+# the column is NOT NULL, so they are recorded against this address
+UNKNOWN_IP_ADDRESS = '0.0.0.0'
+
+# Cached dashboard payloads; bumping the generation orphans every entry
+DASHBOARD_CACHE_KEY = 'dash:{generation}:{user_id}:{is_admin}:{days}'
+DASHBOARD_GENERATION_KEY = 'dash:generation'
+DASHBOARD_ADMIN_TIMEOUT = 60
+DASHBOARD_USER_TIMEOUT = 300
+
+# Daily trend series outlive a dashboard generation; votes and sign-ups
+# are not touched by the analytics refresh that bumps it
+TREND_CACHE_KEY = 'trend:{date_field}:{scope}:{days}'
+TREND_CACHE_TIMEOUT = 300
+
+# Transient database failures; the batch jobs re-raise these so the
+# Celery tasks can retry them instead of reporting a plain failure
+RETRIABLE_DB_ERRORS = (OperationalError, InterfaceError)
+
+# Without Redis, ANALYTICS_ASYNC_EVENTS hands events to a writer thread
+EVENT_QUEUE_MAXSIZE = 10000
+EVENT_QUEUE_BATCH_SIZE = 500
+
+# Users refreshed per transaction by update_user_analytics
+USER_ANALYTICS_CHUNK_SIZE = 500
+
+
+def _insert_events(events):
+    """Insert event rows, dropping references to since-deleted rows"""
+    return AnalyticsEvent.bulk_log(AnalyticsEvent.clear_missing_refs(events))
+
+
+_event_writer = BatchWriter(
+    'analytics-events', _insert_events, 'analytics events',
+    maxsize=EVENT_QUEUE_MAXSIZE, batch_size=EVENT_QUEUE_BATCH_SIZE)
+
+
+# All-time events per country, shared by the snapshots of the hour
+COUNTRY_DISTRIBUTION_KEY = 'analytics:country_distribution'
+COUNTRY_DISTRIBUTION_TIMEOUT = 3600
+
 
 class AnalyticsService:
     """Service for handling analytics calculations and aggregations"""
@@ -18,168 +86,308 @@ class AnalyticsService:
 
     def track_event(self, event_type: str, user=None, poll=None, ip_address: str = '',
                     country_code: str = '', device_type: str = 'unknown',
-                    metadata: Dict = None) -> Optional[AnalyticsEvent]:
-        """Track an analytics event"""
+                    metadata: Dict = None, user_id: int = None,
+                    poll_id: int = None) -> Optional[AnalyticsEvent]:
+        """Track an analytics event
+
+        user_id/poll_id may be passed instead of instances to skip loading
+        them. With Redis the event is buffered and written by the flush
+        task, so the returned instance is not saved yet.
+        """
         try:
-            event = AnalyticsEvent.objects.create(
+            event = AnalyticsEvent(
                 event_type=event_type,
-                user=user,
-                poll=poll,
-                ip_address=ip_address,
+                user_id=user.pk if user else user_id,
+                poll_id=poll.pk if poll else poll_id,
+                ip_address=ip_address or UNKNOWN_IP_ADDRESS,
                 country_code=country_code,
                 device_type=device_type,
                 metadata=metadata or {}
             )
 
+            buffer = self._event_buffer()
+            if buffer is not None:
+                buffer.rpush(EVENT_BUFFER_KEY, self._buffer_entry(event))
+            elif settings.ANALYTICS_ASYNC_EVENTS:
+                self._enqueue_event(event)
+            else:
+                event.save()
+
+            if event_type == 'poll_view' and event.poll_id:
+                self.increment_poll_counter(event.poll_id, 'views')
+
             # Trigger real-time updates for important events
             if event_type in ['poll_vote', 'poll_view']:
-                self._update_poll_analytics_realtime(poll)
+                self.queue_realtime_update(event.poll_id)
 
             return event
         except Exception as e:
             self.logger.error(f"Error tracking analytics event: {e}")
             return None
 
-    def update_poll_analytics(self, poll_id: int = None) -> bool:
-        """Update analytics for a specific poll or all active polls"""
-        from apps.polls.models import Poll, Vote, VoteSession
+    def flush_event_buffer(self, batch_size: int = EVENT_BUFFER_BATCH_SIZE) -> int:
+        """Write up to batch_size buffered events in one COPY
+
+        Returns the number written; rows that fail on their own are moved
+        to EVENT_DEAD_LETTER_KEY.
+        """
+        buffer = self._event_buffer()
+        if buffer is None:
+            return 0
+
+        # Take the batch off the list atomically
+        pipe = buffer.pipeline()
+        pipe.lrange(EVENT_BUFFER_KEY, 0, batch_size - 1)
+        pipe.ltrim(EVENT_BUFFER_KEY, batch_size, -1)
+        entries, _ = pipe.execute()
+        if not entries:
+            return 0
+
+        # A bad row must not hold up the buffer: it is moved aside rather
+        # than going back to the head of the list with the rest
+        rows, dead = [], []
+        for entry in entries:
+            try:
+                event = json.loads(entry)
+                event['created_at'] = datetime.fromisoformat(
+                    event['created_at'])
+            except (ValueError, TypeError, KeyError) as e:
+                self.logger.error(f"Unreadable buffered analytics event: {e}")
+                dead.append(entry)
+                continue
+            rows.append((entry, event))
+
+        events = [event for _, event in rows]
+        try:
+            AnalyticsEvent.clear_missing_refs(events)
+            with transaction.atomic():
+                AnalyticsEvent.copy_log(events)
+            rows = []
+        except RETRIABLE_DB_ERRORS:
+            # Put the batch back at the head so the next run retries it
+            buffer.lpush(EVENT_BUFFER_KEY, *reversed(entries))
+            raise
+        except Exception as e:
+            self.logger.warning(f"Buffered analytics event COPY failed, "
+                                f"retrying row by row: {e}")
+
+        if rows:
+            failed = {id(event) for event in write_rows(
+                events, AnalyticsEvent.copy_log, 'analytics events')}
+            dead.extend(entry for entry, event in rows
+                        if id(event) in failed)
+        if dead:
+            buffer.rpush(EVENT_DEAD_LETTER_KEY, *dead)
+        return len(entries) - len(dead)
+
+    def buffers_events(self) -> bool:
+        """Whether track_event only appends to the Redis event buffer"""
+        return settings.USE_REDIS
+
+    def _event_buffer(self):
+        """Redis connection holding the event buffer, or None without Redis"""
+        if not self.buffers_events():
+            return None
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    def _buffer_entry(self, event) -> str:
+        """JSON for one buffered event, keyed by AnalyticsEvent.COPY_COLUMNS"""
+        event.created_at = timezone.now()
+        return json.dumps({
+            column: getattr(event, column)
+            for column in AnalyticsEvent.COPY_COLUMNS
+        }, default=str)
+
+    def _enqueue_event(self, event):
+        """Queue an event for the writer thread once the caller commits"""
+        row = {field: getattr(event, field)
+               for field in AnalyticsEvent.COPY_COLUMNS}
+
+        def enqueue():
+            if not _event_writer.put(row):
+                # The writer is behind; insert inline rather than drop it
+                _event_writer.write([row])
+
+        transaction.on_commit(enqueue, robust=True)
+
+    # Columns written by the bulk poll refresh
+    POLL_ANALYTICS_FIELDS = [
+        'total_votes', 'unique_voters', 'completion_rate', 'bookmark_count',
+        'share_count', 'view_count', 'view_to_vote_rate', 'votes_by_hour',
+        'votes_by_day', 'votes_by_country', 'votes_by_platform',
+        'top_countries', 'top_country', 'peak_voting_hour', 'total_revenue',
+        'total_revenue_cents', 'avg_revenue_per_vote', 'last_calculated',
+        'last_updated',
+    ]
+
+    def update_poll_analytics(self, poll_id: int = None,
+                              poll_ids: list = None) -> bool:
+        """Update analytics for a specific poll, a list of polls or all active polls"""
+        from apps.polls.models import Poll, VoteSession
 
         try:
             if poll_id:
                 polls = Poll.objects.filter(id=poll_id)
+            elif poll_ids is not None:
+                polls = Poll.objects.filter(id__in=poll_ids)
             else:
                 polls = Poll.objects.filter(is_active=True)
 
-            for poll in polls:
-                analytics, created = PollAnalytics.objects.get_or_create(
-                    poll=poll)
-
-                # Basic metrics
-                analytics.total_votes = Vote.objects.filter(
-                    choice__question__poll=poll
-                ).count()
-
-                analytics.unique_voters = VoteSession.objects.filter(
-                    poll=poll
-                ).values('user', 'ip_address').distinct().count()
-
-                # Calculate completion rate
-                if analytics.unique_voters > 0:
-                    required_questions = poll.questions.filter(
-                        is_required=True).count()
-                    if required_questions > 0:
-                        completed_sessions = VoteSession.objects.annotate(
-                            votes_count=Count('votes__id')
-                        ).filter(
-                            poll=poll,
-                            votes_count__gte=required_questions
-                        ).count()
-
-                        analytics.completion_rate = (
-                            completed_sessions / analytics.unique_voters) * 100
-
-                # Time-series data - last 24 hours
-                analytics.votes_by_hour = self._calculate_hourly_votes(poll)
-                analytics.votes_by_day = self._calculate_daily_votes(poll)
-
-                # Geographic distribution
-                analytics.votes_by_country = self._calculate_geographic_distribution(
-                    poll)
-
-                # Platform distribution
-                analytics.votes_by_platform = self._calculate_platform_distribution(
-                    poll)
+            # Required questions ride along on the poll fetch
+            polls = {poll.id: poll for poll in polls.annotate(
+                required_questions=Count(
+                    'questions', filter=Q(questions__is_required=True))
+            )}
+            if not polls:
+                return True
+            ids = list(polls)
+
+            PollAnalytics.objects.bulk_create(
+                [PollAnalytics(poll_id=pid, creator_id=poll.creator_id)
+                 for pid, poll in polls.items()],
+                ignore_conflicts=True
+            )
+            analytics_by_poll = PollAnalytics.objects.in_bulk(
+                ids, field_name='poll_id')
+
+            # Every counter below is one GROUP BY poll over all the polls
+            counter_counts = {
+                counter: self._count_by_poll(queryset, poll_field)
+                for counter, (queryset, poll_field)
+                in self._poll_counter_querysets(ids).items()
+            }
+            total_votes = counter_counts['votes']
+            # One session per (poll, ip_address): sessions are voters
+            unique_voters = self._count_by_poll(
+                VoteSession.objects.filter(poll_id__in=ids), 'poll_id')
+            bookmarks = counter_counts['bookmarks']
+            shares = counter_counts['shares']
+            views = counter_counts['views']
+            revenue = self._calculate_poll_revenue(ids)
+
+            votes_by_hour = self._calculate_hourly_votes(ids)
+            votes_by_day = self._calculate_daily_votes(ids)
+            votes_by_country, votes_by_platform = \
+                self._calculate_vote_distributions(ids)
+
+            completed_voters = PollAnalytics.get_completed_voters(
+                {pid: poll.required_questions for pid, poll in polls.items()})
+
+            now = timezone.now()
+            changed_rows = {}
+            for pid, analytics in analytics_by_poll.items():
+                poll = analytics.poll = polls[pid]
+                previous = {field: getattr(analytics, field)
+                            for field in self.POLL_ANALYTICS_FIELDS}
+
+                analytics.total_votes = total_votes.get(pid, 0)
+                analytics.unique_voters = unique_voters.get(pid, 0)
+                required = poll.required_questions
+                if analytics.unique_voters > 0 and required > 0:
+                    completed = completed_voters.get(pid, 0)
+                    analytics.completion_rate = (
+                        completed / analytics.unique_voters) * 100
+
+                analytics.votes_by_hour = votes_by_hour[pid]
+                analytics.votes_by_day = votes_by_day[pid]
+                analytics.votes_by_country = votes_by_country.get(pid, {})
+                analytics.votes_by_platform = votes_by_platform.get(pid, {})
+
+                analytics.top_countries = sorted(
+                    analytics.votes_by_country,
+                    key=analytics.votes_by_country.get,
+                    reverse=True
+                )[:10]
+                analytics.sync_summary_fields()
 
                 # Revenue metrics for paid polls
                 if poll.is_paid:
-                    analytics.total_revenue = self._calculate_poll_revenue(
-                        poll)
+                    analytics.total_revenue = revenue.get(pid, 0)
                     if analytics.total_votes > 0:
                         analytics.avg_revenue_per_vote = analytics.total_revenue / analytics.total_votes
+                    analytics.sync_revenue_cents()
 
                 # Engagement metrics
-                analytics.bookmark_count = poll.bookmarks.count()
-                analytics.share_count = poll.shares.count()
-                analytics.view_count = AnalyticsEvent.objects.filter(
-                    poll=poll,
-                    event_type='poll_view'
-                ).count()
+                analytics.bookmark_count = bookmarks.get(pid, 0)
+                analytics.share_count = shares.get(pid, 0)
+                analytics.view_count = views.get(pid, 0)
 
                 # View to vote conversion rate
                 if analytics.view_count > 0:
                     analytics.view_to_vote_rate = (
                         analytics.total_votes / analytics.view_count) * 100
 
-                analytics.last_calculated = timezone.now()
-                analytics.save()
+                # bulk_update skips auto_now
+                analytics.last_calculated = analytics.last_updated = now
+
+                changed = frozenset(
+                    field for field in self.POLL_ANALYTICS_FIELDS
+                    if getattr(analytics, field) != previous[field]
+                )
+                changed_rows.setdefault(changed, []).append(analytics)
+
+            # Write the whole batch in one transaction rather than one
+            # autocommit per statement
+            with transaction.atomic():
+                # Only write the columns that changed, so unchanged JSON
+                # distributions are not rewritten
+                for fields, rows in changed_rows.items():
+                    PollAnalytics.objects.bulk_update(
+                        rows, fields=sorted(fields), batch_size=500)
+
+            # The fresh counts also correct any drift in the counter cache
+            self.reconcile_poll_counters(ids, counter_counts)
+            self.invalidate_dashboards()
 
             return True
 
+        except RETRIABLE_DB_ERRORS:
+            raise
         except Exception as e:
             self.logger.error(f"Error updating poll analytics: {e}")
             return False
 
+    def get_recently_active_users(self):
+        """Users with activity in the last 30 days"""
+        from apps.polls.models import Poll, VoteSession
+
+        recent_date = timezone.now() - timedelta(days=30)
+
+        # EXISTS probes per user instead of joining both tables and
+        # de-duplicating the result
+        return User.objects.filter(
+            Q(last_login__gte=recent_date) |
+            Exists(Poll.objects.filter(
+                creator=OuterRef('pk'), created_at__gte=recent_date)) |
+            Exists(VoteSession.objects.filter(
+                user=OuterRef('pk'), created_at__gte=recent_date))
+        )
+
     def update_user_analytics(self, user_id: int = None) -> bool:
         """Update analytics for a specific user or all users"""
         try:
             if user_id:
                 users = User.objects.filter(id=user_id)
             else:
-                # Only update analytics for users with recent activity
-                recent_date = timezone.now() - timedelta(days=30)
-                users = User.objects.filter(
-                    Q(last_login__gte=recent_date) |
-                    Q(polls__created_at__gte=recent_date) |
-                    Q(vote_sessions__created_at__gte=recent_date)
-                ).distinct()
-
-            for user in users:
-                analytics, created = UserAnalytics.objects.get_or_create(
-                    user=user)
-
-                # Poll metrics
-                user_polls = user.polls.all()
-                analytics.polls_created = user_polls.count()
-                analytics.active_polls = user_polls.filter(
-                    is_active=True).count()
-
-                # Voting metrics
-                from apps.polls.models import VoteSession, Vote
-                analytics.polls_voted = VoteSession.objects.filter(
-                    user=user
-                ).values('poll').distinct().count()
-
-                analytics.total_votes_made = Vote.objects.filter(
-                    choice__question__poll__vote_sessions__user=user
-                ).count()
-
-                analytics.total_votes_received = Vote.objects.filter(
-                    choice__question__poll__creator=user
-                ).count()
-
-                # Engagement metrics
-                analytics.bookmarks_made = user.bookmarks.count()
-                analytics.shares_made = user.shares.count()
-
-                # Revenue metrics
-                analytics.total_revenue = self._calculate_user_revenue(user)
-                analytics.total_spent = self._calculate_user_spending(user)
-
-                # Activity patterns
-                analytics.most_active_hour = self._calculate_most_active_hour(
-                    user)
-                analytics.most_active_day = self._calculate_most_active_day(
-                    user)
-
-                # Primary country
-                analytics.primary_country = self._calculate_primary_country(
-                    user)
-
-                analytics.last_calculated = timezone.now()
-                analytics.save()
+                users = self.get_recently_active_users()
+
+            # One transaction per chunk of users instead of one per save(),
+            # bounded so row locks are not held for the whole run and a
+            # failure leaves the chunks before it committed
+            user_ids = list(users.values_list('id', flat=True))
+            for i in range(0, len(user_ids), USER_ANALYTICS_CHUNK_SIZE):
+                chunk = user_ids[i:i + USER_ANALYTICS_CHUNK_SIZE]
+                with transaction.atomic():
+                    for user in User.objects.filter(id__in=chunk):
+                        analytics, _ = UserAnalytics.objects.get_or_create(
+                            user=user)
+                        analytics.update_metrics()
 
             return True
 
+        except RETRIABLE_DB_ERRORS:
+            raise
         except Exception as e:
             self.logger.error(f"Error updating user analytics: {e}")
             return False
@@ -218,13 +426,16 @@ class AnalyticsService:
             # Calculate metrics
             from apps.polls.models import Poll, Vote, VoteSession
 
+            # Table totals are kept by signals rather than COUNT(*)
+            totals = TableCounter.objects.current()
+
             snapshot = AnalyticsSnapshot.objects.create(
                 snapshot_type=snapshot_type,
                 timestamp=timestamp,
-                total_users=User.objects.count(),
-                total_polls=Poll.objects.count(),
+                total_users=totals['users'],
+                total_polls=totals['polls'],
                 active_polls=Poll.objects.filter(is_active=True).count(),
-                total_votes=Vote.objects.count(),
+                total_votes=totals['votes'],
                 total_revenue=self._calculate_total_revenue(),
                 top_countries=self._get_top_countries(),
                 country_distribution=self._get_country_distribution(),
@@ -242,211 +453,314 @@ class AnalyticsService:
             snapshot.new_revenue = self._calculate_period_revenue(
                 period_start, period_end)
 
+            snapshot.metrics['events_by_hour_country'] = \
+                self._get_hour_country_histogram(period_start, period_end)
+
             # Active users in period
             snapshot.active_users = User.objects.filter(
                 Q(last_login__gte=period_start) |
-                Q(vote_sessions__created_at__gte=period_start)
-            ).distinct().count()
+                Exists(VoteSession.objects.filter(
+                    user=OuterRef('pk'), created_at__gte=period_start))
+            ).count()
 
             snapshot.save()
             return True
 
+        except RETRIABLE_DB_ERRORS:
+            raise
         except Exception as e:
             self.logger.error(f"Error creating analytics snapshot: {e}")
             return False
 
-    def _update_poll_analytics_realtime(self, poll):
-        """Quick update for real-time analytics"""
-        if not poll:
-            return
+    def dashboard_cache_key(self, user_id, is_admin, days) -> str:
+        """Cache key for one dashboard payload in the current generation"""
+        return DASHBOARD_CACHE_KEY.format(
+            generation=cache.get(DASHBOARD_GENERATION_KEY, 0),
+            user_id=user_id, is_admin=int(is_admin), days=days
+        )
 
+    def invalidate_dashboards(self):
+        """Drop every cached dashboard by moving to a new generation"""
+        cache.add(DASHBOARD_GENERATION_KEY, 0, timeout=None)
         try:
-            analytics, created = PollAnalytics.objects.get_or_create(poll=poll)
+            cache.incr(DASHBOARD_GENERATION_KEY)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(DASHBOARD_GENERATION_KEY, 1, timeout=None)
+
+    def queue_realtime_update(self, poll_id):
+        """Hand the real-time counter refresh to a Celery worker"""
+        if not poll_id:
+            return
 
-            # Update basic counters only
-            from apps.polls.models import Vote
-            analytics.total_votes = Vote.objects.filter(
-                choice__question__poll=poll
-            ).count()
+        from .tasks import update_poll_realtime
 
-            analytics.view_count = AnalyticsEvent.objects.filter(
-                poll=poll,
-                event_type='poll_view'
-            ).count()
+        # Coalesce bursts: while a refresh is pending for this poll, later
+        # events are covered by it and schedule nothing
+        if not cache.add(REALTIME_PENDING_KEY.format(poll_id=poll_id), 1,
+                         timeout=REALTIME_DEBOUNCE_SECONDS):
+            return
 
-            if analytics.view_count > 0:
-                analytics.view_to_vote_rate = (
-                    analytics.total_votes / analytics.view_count) * 100
+        # Enqueue after commit so the worker sees the row that triggered it
+        transaction.on_commit(
+            lambda: update_poll_realtime.apply_async(
+                args=[poll_id], countdown=REALTIME_DEBOUNCE_SECONDS),
+            robust=True
+        )
+
+    def _poll_counter_querysets(self, poll_ids):
+        """Source-of-truth queryset and poll id field for each counter"""
+        from apps.polls.models import Vote, Bookmark, PollShare
+
+        return {
+            'votes': (Vote.objects.filter(
+                poll_id__in=poll_ids),
+                'poll_id'),
+            'views': (AnalyticsEvent.objects.filter(
+                poll_id__in=poll_ids, event_type='poll_view'), 'poll_id'),
+            'bookmarks': (Bookmark.objects.filter(
+                poll_id__in=poll_ids), 'poll_id'),
+            'shares': (PollShare.objects.filter(
+                poll_id__in=poll_ids), 'poll_id'),
+        }
+
+    def increment_poll_counter(self, poll_id, counter, delta=1):
+        """Adjust a cached poll counter once the current transaction commits"""
+        def apply():
+            key = POLL_COUNTER_KEY.format(poll_id=poll_id, counter=counter)
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # Not cached yet: seed from the database, which already
+                # includes the committed change
+                queryset, _ = self._poll_counter_querysets([poll_id])[counter]
+                cache.add(key, queryset.count(), timeout=None)
+
+        transaction.on_commit(apply, robust=True)
+
+    def get_poll_counters(self, poll_id) -> Dict[str, int]:
+        """Cached counters for a poll, seeding any missing from the database"""
+        keys = {
+            counter: POLL_COUNTER_KEY.format(poll_id=poll_id, counter=counter)
+            for counter in POLL_COUNTERS
+        }
+        cached = cache.get_many(keys.values())
+
+        counters = {}
+        querysets = None
+        for counter, key in keys.items():
+            if key in cached:
+                counters[counter] = cached[key]
+                continue
+            if querysets is None:
+                querysets = self._poll_counter_querysets([poll_id])
+            counters[counter] = querysets[counter][0].count()
+            cache.add(key, counters[counter], timeout=None)
+        return counters
+
+    def reconcile_poll_counters(self, poll_ids=None, counts=None) -> int:
+        """Overwrite cached counters with database counts (or given counts)"""
+        from apps.polls.models import Poll
+
+        if poll_ids is None:
+            poll_ids = list(Poll.objects.filter(
+                is_active=True).values_list('id', flat=True))
+        if counts is None:
+            counts = {
+                counter: self._count_by_poll(queryset, poll_field)
+                for counter, (queryset, poll_field)
+                in self._poll_counter_querysets(poll_ids).items()
+            }
+
+        cache.set_many({
+            POLL_COUNTER_KEY.format(poll_id=pid, counter=counter):
+                counts[counter].get(pid, 0)
+            for pid in poll_ids
+            for counter in POLL_COUNTERS
+        }, timeout=None)
+        return len(poll_ids)
 
-            analytics.save(
-                update_fields=['total_votes', 'view_count', 'view_to_vote_rate'])
+    def _update_poll_analytics_realtime(self, poll):
+        """Quick update for real-time analytics"""
+        if not poll:
+            return
 
+        try:
+            analytics, created = PollAnalytics.objects.get_or_create(
+                poll=poll, defaults={'creator_id': poll.creator_id})
+
+            # Update basic counters only, read from the counter cache
+            counters = self.get_poll_counters(poll.id)
+            changes = {
+                'total_votes': counters['votes'],
+                'view_count': counters['views'],
+                'bookmark_count': counters['bookmarks'],
+                'share_count': counters['shares'],
+                'last_updated': timezone.now(),
+            }
+
+            if changes['view_count'] > 0:
+                changes['view_to_vote_rate'] = (
+                    changes['total_votes'] / changes['view_count']) * 100
+
+            # Runs on every tracked event: a queryset UPDATE skips the model
+            # save machinery entirely
+            PollAnalytics.objects.filter(pk=analytics.pk).update(**changes)
+
+        except RETRIABLE_DB_ERRORS:
+            raise
         except Exception as e:
             self.logger.error(f"Error in real-time analytics update: {e}")
 
-    def _calculate_hourly_votes(self, poll) -> Dict[str, int]:
-        """Calculate votes by hour for the last 24 hours"""
-        from apps.polls.models import Vote
+    def _count_by_poll(self, queryset, poll_field) -> Dict[int, int]:
+        """Row counts of queryset grouped by poll id"""
+        return dict(queryset.values(poll_field).annotate(
+            count=Count('id')
+        ).order_by().values_list(poll_field, 'count'))
 
-        now = timezone.now()
-        yesterday = now - timedelta(hours=24)
+    def _calculate_hourly_votes(self, poll_ids) -> Dict[int, Dict[str, int]]:
+        """Calculate votes by hour for the last 24 hours, per poll"""
+        from django.db.models.functions import TruncHour
+        from apps.polls.models import Vote
 
-        hourly_votes = {}
-        for hour in range(24):
-            hour_start = yesterday + timedelta(hours=hour)
-            hour_end = yesterday + timedelta(hours=hour + 1)
+        # Bucket 0 is the hour 23 hours before the current one
+        first_hour = timezone.localtime().replace(
+            minute=0, second=0, microsecond=0) - timedelta(hours=23)
 
-            count = Vote.objects.filter(
-                choice__question__poll=poll,
-                created_at__gte=hour_start,
-                created_at__lt=hour_end
-            ).count()
+        counts = Vote.objects.filter(
+            poll_id__in=poll_ids,
+            created_at__gte=first_hour
+        ).annotate(
+            hour=TruncHour('created_at')
+        ).values('poll_id', 'hour').annotate(
+            count=Count('id')
+        ).order_by()
 
-            hourly_votes[str(hour)] = count
+        hourly_votes = {
+            pid: {str(hour): 0 for hour in range(24)} for pid in poll_ids
+        }
+        for row in counts:
+            index = int((row['hour'] - first_hour).total_seconds() // 3600)
+            if 0 <= index < 24:
+                hourly_votes[row['poll_id']][str(index)] = \
+                    row['count']
 
         return hourly_votes
 
-    def _calculate_daily_votes(self, poll) -> Dict[str, int]:
-        """Calculate votes by day for the last 30 days"""
+    def _calculate_daily_votes(self, poll_ids) -> Dict[int, Dict[str, int]]:
+        """Calculate votes by day for the last 30 days, per poll"""
+        from django.db.models.functions import TruncDate
         from apps.polls.models import Vote
 
-        now = timezone.now()
-        thirty_days_ago = now - timedelta(days=30)
-
-        daily_votes = {}
-        for day in range(30):
-            day_start = thirty_days_ago + timedelta(days=day)
-            day_end = day_start + timedelta(days=1)
+        first_day = timezone.localdate() - timedelta(days=29)
+        window_start = timezone.make_aware(
+            datetime.combine(first_day, time.min))
 
-            count = Vote.objects.filter(
-                choice__question__poll=poll,
-                created_at__gte=day_start,
-                created_at__lt=day_end
-            ).count()
+        counts = Vote.objects.filter(
+            poll_id__in=poll_ids,
+            created_at__gte=window_start
+        ).annotate(
+            day=TruncDate('created_at')
+        ).values('poll_id', 'day').annotate(
+            count=Count('id')
+        ).order_by()
 
-            date_str = day_start.strftime('%Y-%m-%d')
-            daily_votes[date_str] = count
+        days = [(first_day + timedelta(days=day)).strftime('%Y-%m-%d')
+                for day in range(30)]
+        daily_votes = {pid: dict.fromkeys(days, 0) for pid in poll_ids}
+        for row in counts:
+            date_str = row['day'].strftime('%Y-%m-%d')
+            votes = daily_votes[row['poll_id']]
+            if date_str in votes:
+                votes[date_str] = row['count']
 
         return daily_votes
 
-    def _calculate_geographic_distribution(self, poll) -> Dict[str, int]:
-        """Calculate votes by country"""
-        events = AnalyticsEvent.objects.filter(
-            poll=poll,
-            event_type='poll_vote'
-        ).values('country_code').annotate(
-            count=Count('id')
-        ).order_by('-count')
-
-        return {item['country_code']: item['count'] for item in events}
+    def _calculate_vote_distributions(self, poll_ids):
+        """Calculate votes by country and by device type, per poll
 
-    def _calculate_platform_distribution(self, poll) -> Dict[str, int]:
-        """Calculate votes by device type"""
+        Both distributions come from one GROUP BY over the vote events.
+        """
         events = AnalyticsEvent.objects.filter(
-            poll=poll,
+            poll_id__in=poll_ids,
             event_type='poll_vote'
-        ).values('device_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
-
-        return {item['device_type']: item['count'] for item in events}
-
-    def _calculate_poll_revenue(self, poll) -> float:
-        """Calculate total revenue for a poll"""
-        try:
-            from apps.payments.models import Transaction
-            return Transaction.objects.filter(
-                poll=poll,
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-        except:
-            return 0
-
-    def _calculate_user_revenue(self, user) -> float:
-        """Calculate total revenue earned by user"""
-        try:
-            from apps.payments.models import Transaction
-            return Transaction.objects.filter(
-                poll__creator=user,
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-        except:
-            return 0
-
-    def _calculate_user_spending(self, user) -> float:
-        """Calculate total amount spent by user"""
-        try:
-            from apps.payments.models import Transaction
-            return Transaction.objects.filter(
-                user=user,
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-        except:
-            return 0
-
-    def _calculate_most_active_hour(self, user) -> int:
-        """Calculate user's most active hour"""
-        from django.db.models import Count
-
-        hours = AnalyticsEvent.objects.filter(
-            user=user
-        ).extra(
-            select={'hour': 'EXTRACT(hour FROM created_at)'}
-        ).values('hour').annotate(
-            count=Count('id')
-        ).order_by('-count')
-
-        return int(hours.first()['hour']) if hours else 12
-
-    def _calculate_most_active_day(self, user) -> int:
-        """Calculate user's most active day of week"""
-        from django.db.models import Count
-
-        days = AnalyticsEvent.objects.filter(
-            user=user
-        ).extra(
-            select={'dow': 'EXTRACT(dow FROM created_at)'}
-        ).values('dow').annotate(
+        ).values('poll_id', 'country_code', 'device_type').annotate(
             count=Count('id')
-        ).order_by('-count')
-
-        return int(days.first()['dow']) if days else 1
-
-    def _calculate_primary_country(self, user) -> str:
-        """Calculate user's primary country"""
-        country = AnalyticsEvent.objects.filter(
-            user=user
-        ).values('country_code').annotate(
-            count=Count('id')
-        ).order_by('-count').first()
-
-        return country['country_code'] if country else ''
+        ).order_by()
+
+        by_country, by_platform = {}, {}
+        for item in events:
+            countries = by_country.setdefault(item['poll_id'], {})
+            countries[item['country_code']] = \
+                countries.get(item['country_code'], 0) + item['count']
+            platforms = by_platform.setdefault(item['poll_id'], {})
+            platforms[item['device_type']] = \
+                platforms.get(item['device_type'], 0) + item['count']
+
+        # Keep the busiest keys first, as the per-column queries did
+        for distribution in (by_country, by_platform):
+            for pid, counts in distribution.items():
+                distribution[pid] = dict(
+                    sorted(counts.items(), key=lambda kv: kv[1], reverse=True))
+        return by_country, by_platform
+
+    def _calculate_poll_revenue(self, poll_ids) -> Dict[int, float]:
+        """Calculate total revenue per poll"""
+        if Transaction is None:
+            return {}
+        return dict(Transaction.objects.filter(
+            poll_id__in=poll_ids,
+            status='completed'
+        ).values('poll_id').annotate(
+            total=Sum('amount')
+        ).order_by().values_list('poll_id', 'total'))
 
     def _calculate_total_revenue(self) -> float:
         """Calculate system-wide revenue"""
-        try:
-            from apps.payments.models import Transaction
-            return Transaction.objects.filter(
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-        except:
+        if Transaction is None:
             return 0
+        return Transaction.objects.filter(
+            status='completed'
+        ).aggregate(total=Sum('amount'))['total'] or 0
 
     def _get_top_countries(self, limit: int = 10) -> list:
         """Get top countries by activity"""
-        countries = AnalyticsEvent.objects.values('country_code').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit]
-
-        return [item['country_code'] for item in countries]
+        return list(self._get_country_distribution())[:limit]
 
     def _get_country_distribution(self) -> Dict[str, int]:
-        """Get complete country distribution"""
+        """Get complete country distribution, busiest first"""
+        distribution = cache.get(COUNTRY_DISTRIBUTION_KEY)
+        if distribution is not None:
+            return distribution
+
         countries = AnalyticsEvent.objects.values('country_code').annotate(
             count=Count('id')
         ).order_by('-count')
 
-        return {item['country_code']: item['count'] for item in countries}
+        distribution = {item['country_code']: item['count']
+                        for item in countries}
+        cache.set(COUNTRY_DISTRIBUTION_KEY, distribution,
+                  timeout=COUNTRY_DISTRIBUTION_TIMEOUT)
+        return distribution
+
+    def _get_hour_country_histogram(self, start, end) -> Dict[str, list]:
+        """Events per hour of day for each country, counted by the database"""
+        from django.db.models.functions import ExtractHour
+
+        rows = AnalyticsEvent.objects.filter(
+            created_at__gte=start,
+            created_at__lt=end
+        ).annotate(
+            hour=ExtractHour('created_at')
+        ).values('country_code', 'hour').annotate(
+            count=Count('id')
+        ).order_by()
+
+        histogram = {}
+        for row in rows:
+            hours = histogram.setdefault(row['country_code'], [0] * 24)
+            hours[row['hour']] = row['count']
+        return histogram
 
     def _get_period_start(self, timestamp, snapshot_type):
         """Get the start of the period for snapshot calculations"""
@@ -474,12 +788,10 @@ class AnalyticsService:
 
     def _calculate_period_revenue(self, start, end) -> float:
         """Calculate revenue for a specific period"""
-        try:
-            from apps.payments.models import Transaction
-            return Transaction.objects.filter(
-                status='completed',
-                created_at__gte=start,
-                created_at__lt=end
-            ).aggregate(total=Sum('amount'))['total'] or 0
-        except:
+        if Transaction is None:
             return 0
+        return Transaction.objects.filter(
+            status='completed',
+            created_at__gte=start,
+            created_at__lt=end
+        ).aggregate(total=Sum('amount'))['total'] or 0
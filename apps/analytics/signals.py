@@ -2,39 +2,41 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from apps.polls.models import Poll, Vote, VoteSession, Bookmark, PollShare
-from .models import AnalyticsEvent, PollAnalytics, UserAnalytics
+from .models import AnalyticsEvent, PollAnalytics, UserAnalytics, TableCounter
 from .services import AnalyticsService
 
 User = get_user_model()
 
+# AnalyticsService holds no per-call state, so receivers share one instance
+analytics_service = AnalyticsService()
+
 
 @receiver(post_save, sender=Vote)
 def track_vote_event(sender, instance, created, **kwargs):
     """Track vote events for analytics"""
     if created:
-        analytics_service = AnalyticsService()
-
-        # Get poll and user from the vote
-        poll = instance.choice.question.poll
+        # Vote.save() caches the poll it resolved from the choice
+        poll = instance.poll
 
-        # Try to find the vote session to get user info
-        vote_session = VoteSession.objects.filter(
-            poll=poll,
+        # Try to find the vote session to get the voter's id
+        user_id = VoteSession.objects.filter(
+            poll_id=instance.poll_id,
             ip_address=instance.ip_address
-        ).first()
+        ).values_list('user_id', flat=True).first()
 
-        user = vote_session.user if vote_session else None
+        analytics_service.increment_poll_counter(instance.poll_id, 'votes')
+        TableCounter.objects.increment('votes')
 
         # Track the event
         analytics_service.track_event(
             event_type='poll_vote',
-            user=user,
+            user_id=user_id,
             poll=poll,
             ip_address=instance.ip_address,
             metadata={
-                'choice_id': instance.choice.id,
+                'choice_id': instance.choice_id,
                 'choice_text': instance.choice.text,
-                'question_id': instance.choice.question.id,
+                'question_id': instance.choice.question_id,
                 'question_text': instance.choice.question.text,
             }
         )
@@ -44,11 +46,10 @@ def track_vote_event(sender, instance, created, **kwargs):
 def track_poll_creation(sender, instance, created, **kwargs):
     """Track poll creation events"""
     if created:
-        analytics_service = AnalyticsService()
-
+        TableCounter.objects.increment('polls')
         analytics_service.track_event(
             event_type='poll_create',
-            user=instance.creator,
+            user_id=instance.creator_id,
             poll=instance,
             metadata={
                 'is_paid': instance.is_paid,
@@ -59,18 +60,18 @@ def track_poll_creation(sender, instance, created, **kwargs):
         )
 
         # Create analytics record for the poll
-        PollAnalytics.objects.get_or_create(poll=instance)
+        PollAnalytics.objects.get_or_create(
+            poll=instance, defaults={'creator_id': instance.creator_id})
 
 
 @receiver(post_save, sender=Bookmark)
 def track_bookmark_event(sender, instance, created, **kwargs):
     """Track bookmark events"""
     if created:
-        analytics_service = AnalyticsService()
-
+        analytics_service.increment_poll_counter(instance.poll_id, 'bookmarks')
         analytics_service.track_event(
             event_type='poll_bookmark',
-            user=instance.user,
+            user_id=instance.user_id,
             poll=instance.poll,
             metadata={
                 'poll_title': instance.poll.title,
@@ -82,12 +83,11 @@ def track_bookmark_event(sender, instance, created, **kwargs):
 def track_share_event(sender, instance, created, **kwargs):
     """Track poll share events"""
     if created:
-        analytics_service = AnalyticsService()
-
+        analytics_service.increment_poll_counter(instance.poll_id, 'shares')
         analytics_service.track_event(
             event_type='poll_share',
-            user=instance.user,
-            poll=instance.poll,
+            user_id=instance.user_id,
+            poll_id=instance.poll_id,
             metadata={
                 'platform': instance.platform,
                 'referral_code': instance.referral_code,
@@ -99,8 +99,7 @@ def track_share_event(sender, instance, created, **kwargs):
 def track_user_registration(sender, instance, created, **kwargs):
     """Track user registration events"""
     if created:
-        analytics_service = AnalyticsService()
-
+        TableCounter.objects.increment('users')
         analytics_service.track_event(
             event_type='user_register',
             user=instance,
@@ -119,34 +118,49 @@ def update_session_analytics(sender, instance, created, **kwargs):
     """Update analytics when vote sessions are created or updated"""
     if created:
         # Update poll analytics in real-time
-        analytics_service = AnalyticsService()
-        analytics_service._update_poll_analytics_realtime(instance.poll)
+        analytics_service.queue_realtime_update(instance.poll_id)
 
 
 @receiver(post_delete, sender=Vote)
 def handle_vote_deletion(sender, instance, **kwargs):
     """Handle vote deletion for analytics"""
-    # Update vote counts when votes are deleted
-    poll = instance.choice.question.poll
-
     # Update analytics
-    analytics_service = AnalyticsService()
-    analytics_service._update_poll_analytics_realtime(poll)
+    analytics_service.increment_poll_counter(instance.poll_id, 'votes', -1)
+    TableCounter.objects.increment('votes', -1)
+    analytics_service.queue_realtime_update(instance.poll_id)
+
+
+@receiver(post_delete, sender=Bookmark)
+def handle_bookmark_deletion(sender, instance, **kwargs):
+    """Keep the cached bookmark count in step with un-bookmarks"""
+    analytics_service.increment_poll_counter(instance.poll_id, 'bookmarks', -1)
+
+
+@receiver(post_delete, sender=PollShare)
+def handle_share_deletion(sender, instance, **kwargs):
+    """Keep the cached share count in step with deleted shares"""
+    analytics_service.increment_poll_counter(instance.poll_id, 'shares', -1)
 
 
 @receiver(post_delete, sender=Poll)
 def handle_poll_deletion(sender, instance, **kwargs):
     """Handle poll deletion for analytics"""
     # Analytics records are deleted via CASCADE
-    # Track the deletion event
-    analytics_service = AnalyticsService()
+    TableCounter.objects.increment('polls', -1)
 
+    # Track the deletion event
     analytics_service.track_event(
         event_type='poll_delete',
-        user=instance.creator,
+        user_id=instance.creator_id,
         metadata={
             'poll_title': instance.title,
             'was_paid': instance.is_paid,
             'vote_price': float(instance.vote_price),
         }
     )
+
+
+@receiver(post_delete, sender=User)
+def handle_user_deletion(sender, instance, **kwargs):
+    """Keep the user total in step with deletions"""
+    TableCounter.objects.increment('users', -1)
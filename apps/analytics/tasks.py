@@ -1,72 +1,96 @@
-from celery import shared_task
+from celery import chord, group, shared_task
+from django.db import InterfaceError, OperationalError
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Only transient connection failures are worth retrying; anything else is
+# a bug or bad data and would fail the same way again
+RETRIABLE_ERRORS = (OperationalError, InterfaceError, ConnectionError,
+                    TimeoutError)
 
-@shared_task(bind=True, max_retries=3)
-def update_poll_analytics(self, poll_id=None):
-    """Update analytics for a specific poll or all active polls"""
-    try:
-        from .services import AnalyticsService
+# Active polls the hourly aggregation refreshes, and how many each
+# parallel update task takes
+HOURLY_POLL_LIMIT = 100
+HOURLY_BATCH_SIZE = 25
 
-        analytics_service = AnalyticsService()
-        success = analytics_service.update_poll_analytics(poll_id)
+@shared_task(bind=True, autoretry_for=RETRIABLE_ERRORS,
+             retry_kwargs={'max_retries': 3}, retry_backoff=60,
+             retry_backoff_max=600, retry_jitter=True)
+def update_poll_analytics(self, poll_id=None, poll_ids=None):
+    """Update analytics for a poll, a batch of polls or all active polls"""
+    from .services import AnalyticsService
 
-        if success:
-            logger.info(
-                f"Successfully updated poll analytics for poll_id: {poll_id}")
-            return {"status": "success", "poll_id": poll_id}
-        else:
-            raise Exception("Analytics update failed")
+    analytics_service = AnalyticsService()
+    success = analytics_service.update_poll_analytics(
+        poll_id, poll_ids=poll_ids)
 
-    except Exception as exc:
-        logger.error(f"Error updating poll analytics: {exc}")
-        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+    if success:
+        logger.info(
+            f"Successfully updated poll analytics for poll_id: {poll_id}, "
+            f"poll_ids: {poll_ids}")
+        return {"status": "success", "poll_id": poll_id, "poll_ids": poll_ids}
+
+    return {"status": "error", "poll_id": poll_id, "poll_ids": poll_ids}
+
+
+@shared_task(bind=True, autoretry_for=RETRIABLE_ERRORS,
+             retry_kwargs={'max_retries': 3}, retry_backoff=10,
+             retry_backoff_max=60, retry_jitter=True)
+def update_poll_realtime(self, poll_id):
+    """Refresh a poll's vote and view counters outside the request cycle"""
+    from django.core.cache import cache
+    from apps.polls.models import Poll
+    from .services import AnalyticsService, REALTIME_PENDING_KEY
 
+    # Release the debounce slot before counting, so events landing
+    # while this runs schedule a follow-up refresh
+    cache.delete(REALTIME_PENDING_KEY.format(poll_id=poll_id))
 
-@shared_task(bind=True, max_retries=3)
+    poll = Poll.objects.filter(id=poll_id).first()
+    if poll is None:
+        return {"status": "skipped", "poll_id": poll_id}
+
+    AnalyticsService()._update_poll_analytics_realtime(poll)
+    return {"status": "success", "poll_id": poll_id}
+
+
+@shared_task(bind=True, autoretry_for=RETRIABLE_ERRORS,
+             retry_kwargs={'max_retries': 3}, retry_backoff=60,
+             retry_backoff_max=600, retry_jitter=True)
 def update_user_analytics(self, user_id=None):
     """Update analytics for a specific user or all active users"""
-    try:
-        from .services import AnalyticsService
+    from .services import AnalyticsService
 
-        analytics_service = AnalyticsService()
-        success = analytics_service.update_user_analytics(user_id)
+    analytics_service = AnalyticsService()
+    success = analytics_service.update_user_analytics(user_id)
 
-        if success:
-            logger.info(
-                f"Successfully updated user analytics for user_id: {user_id}")
-            return {"status": "success", "user_id": user_id}
-        else:
-            raise Exception("User analytics update failed")
+    if success:
+        logger.info(
+            f"Successfully updated user analytics for user_id: {user_id}")
+        return {"status": "success", "user_id": user_id}
 
-    except Exception as exc:
-        logger.error(f"Error updating user analytics: {exc}")
-        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+    return {"status": "error", "user_id": user_id}
 
 
-@shared_task(bind=True, max_retries=2)
+@shared_task(bind=True, autoretry_for=RETRIABLE_ERRORS,
+             retry_kwargs={'max_retries': 2}, retry_backoff=300,
+             retry_backoff_max=600, retry_jitter=True)
 def create_analytics_snapshot(self, snapshot_type='daily'):
     """Create analytics snapshot for trend analysis"""
-    try:
-        from .services import AnalyticsService
+    from .services import AnalyticsService
 
-        analytics_service = AnalyticsService()
-        success = analytics_service.create_snapshot(snapshot_type)
+    analytics_service = AnalyticsService()
+    success = analytics_service.create_snapshot(snapshot_type)
 
-        if success:
-            logger.info(
-                f"Successfully created {snapshot_type} analytics snapshot")
-            return {"status": "success", "snapshot_type": snapshot_type}
-        else:
-            raise Exception("Snapshot creation failed")
+    if success:
+        logger.info(
+            f"Successfully created {snapshot_type} analytics snapshot")
+        return {"status": "success", "snapshot_type": snapshot_type}
 
-    except Exception as exc:
-        logger.error(f"Error creating analytics snapshot: {exc}")
-        raise self.retry(exc=exc, countdown=300)  # 5 minute delay
+    return {"status": "error", "snapshot_type": snapshot_type}
 
 
 @shared_task
@@ -79,18 +103,87 @@ def cleanup_old_analytics_events():
         retention_days = getattr(settings, 'ANALYTICS_RETENTION_DAYS', 365)
         cutoff_date = timezone.now() - timedelta(days=retention_days)
 
+        # On PostgreSQL whole expired months go as a single DROP TABLE;
+        # the batches below only see the month straddling the cutoff
+        partitions_dropped = len(
+            AnalyticsEvent.objects.drop_partitions_before(cutoff_date))
+        AnalyticsEvent.objects.ensure_partitions()
+
+        # Bounded batches, each in its own transaction, keep lock time short
         deleted_count = AnalyticsEvent.objects.filter(
             created_at__lt=cutoff_date
-        ).delete()[0]
+        ).delete_in_batches()
 
-        logger.info(f"Cleaned up {deleted_count} old analytics events")
-        return {"status": "success", "deleted_count": deleted_count}
+        logger.info(
+            f"Cleaned up {deleted_count} old analytics events, "
+            f"dropped {partitions_dropped} partitions")
+        return {
+            "status": "success",
+            "deleted_count": deleted_count,
+            "partitions_dropped": partitions_dropped
+        }
 
     except Exception as exc:
         logger.error(f"Error cleaning up analytics events: {exc}")
         return {"status": "error", "error": str(exc)}
 
 
+@shared_task
+def refresh_recent_analytics_events():
+    """Refresh the materialized 30-day analytics event view"""
+    try:
+        from django.core.management import call_command
+
+        call_command('update_analytics', refresh_recent_events=True)
+        return {"status": "success"}
+
+    except Exception as exc:
+        logger.error(f"Error refreshing recent analytics events: {exc}")
+        return {"status": "error", "error": str(exc)}
+
+
+@shared_task
+def reconcile_poll_counters():
+    """Reset cached poll counters from the database for active polls"""
+    try:
+        from .services import AnalyticsService
+
+        reconciled = AnalyticsService().reconcile_poll_counters()
+        return {"status": "success", "polls_reconciled": reconciled}
+
+    except Exception as exc:
+        logger.error(f"Error reconciling poll counters: {exc}")
+        return {"status": "error", "error": str(exc)}
+
+
+@shared_task
+def flush_analytics_events():
+    """Write the buffered analytics events to the database"""
+    try:
+        from .services import AnalyticsService
+
+        flushed = AnalyticsService().flush_event_buffer()
+        return {"status": "success", "events_flushed": flushed}
+
+    except Exception as exc:
+        logger.error(f"Error flushing analytics events: {exc}")
+        return {"status": "error", "error": str(exc)}
+
+
+@shared_task
+def reconcile_table_counters():
+    """Reset the snapshot table totals from COUNT(*)"""
+    try:
+        from .models import TableCounter
+
+        counts = TableCounter.objects.reconcile()
+        return {"status": "success", "counters": counts}
+
+    except Exception as exc:
+        logger.error(f"Error reconciling table counters: {exc}")
+        return {"status": "error", "error": str(exc)}
+
+
 @shared_task
 def aggregate_hourly_analytics():
     """Aggregate analytics data every hour"""
@@ -102,24 +195,28 @@ def aggregate_hourly_analytics():
         # Create hourly snapshot
         snapshot_success = analytics_service.create_snapshot('hourly')
 
+        # Roll today's and yesterday's events up by country
+        from .models import GeoDailyCount
+        GeoDailyCount.objects.refresh()
+
         # Update real-time analytics for active polls
         from apps.polls.models import Poll
-        active_polls = Poll.objects.filter(is_active=True)[
-            :100]  # Limit to prevent overload
+        poll_ids = list(Poll.objects.filter(is_active=True).values_list(
+            'id', flat=True)[:HOURLY_POLL_LIMIT])  # Limit to prevent overload
 
-        updated_count = 0
-        for poll in active_polls:
-            success = analytics_service.update_poll_analytics(poll.id)
-            if success:
-                updated_count += 1
-
-        logger.info(
-            f"Hourly aggregation: snapshot={snapshot_success}, polls_updated={updated_count}")
+        # Fan the batches out across workers; the callback logs the total
+        batches = [poll_ids[i:i + HOURLY_BATCH_SIZE]
+                   for i in range(0, len(poll_ids), HOURLY_BATCH_SIZE)]
+        if batches:
+            chord(group(
+                update_poll_analytics.s(poll_ids=batch) for batch in batches
+            ))(log_hourly_analytics.s(snapshot_created=snapshot_success))
 
         return {
             "status": "success",
             "snapshot_created": snapshot_success,
-            "polls_updated": updated_count
+            "polls_queued": len(poll_ids),
+            "batches": len(batches)
         }
 
     except Exception as exc:
@@ -127,6 +224,18 @@ def aggregate_hourly_analytics():
         return {"status": "error", "error": str(exc)}
 
 
+@shared_task
+def log_hourly_analytics(results, snapshot_created=False):
+    """Chord callback summarising the hourly poll analytics batches"""
+    updated_count = sum(
+        len(result.get("poll_ids") or ())
+        for result in results if result.get("status") == "success"
+    )
+    logger.info(
+        f"Hourly aggregation: snapshot={snapshot_created}, polls_updated={updated_count}")
+    return {"status": "success", "polls_updated": updated_count}
+
+
 @shared_task
 def track_analytics_event(event_type, user_id=None, poll_id=None,
                           ip_address='', country_code='', device_type='unknown',
@@ -134,32 +243,14 @@ def track_analytics_event(event_type, user_id=None, poll_id=None,
     """Asynchronously track an analytics event"""
     try:
         from .services import AnalyticsService
-        from django.contrib.auth import get_user_model
-        from apps.polls.models import Poll
 
-        User = get_user_model()
         analytics_service = AnalyticsService()
 
-        # Get user and poll objects
-        user = None
-        if user_id:
-            try:
-                user = User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                pass
-
-        poll = None
-        if poll_id:
-            try:
-                poll = Poll.objects.get(id=poll_id)
-            except Poll.DoesNotExist:
-                pass
-
-        # Track the event
+        # Track the event by id; no need to load the user or poll
         event = analytics_service.track_event(
             event_type=event_type,
-            user=user,
-            poll=poll,
+            user_id=user_id,
+            poll_id=poll_id,
             ip_address=ip_address,
             country_code=country_code,
             device_type=device_type,
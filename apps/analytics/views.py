@@ -1,9 +1,15 @@
 import csv
 import json
+import tempfile
 from datetime import timedelta
-from django.http import HttpResponse, JsonResponse
+from itertools import islice
+from django.http import (
+    FileResponse, JsonResponse, StreamingHttpResponse
+)
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Count, Sum, Avg, Q
+from django.db.models import Count, F, Sum, Avg, Q
+from django.db.models.functions import Round
 from django.contrib.auth import get_user_model
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
@@ -12,17 +18,41 @@ from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as filters
 
-from .models import PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnapshot
+from apps.core.renderers import dumps
+from .models import (
+    PollAnalytics, UserAnalytics, AnalyticsEvent, AnalyticsSnapshot,
+    GeoDailyCount, Transaction, ENGAGEMENT_SCORE
+)
 from .serializers import (
-    PollAnalyticsSerializer, UserAnalyticsSerializer, AnalyticsEventSerializer,
+    PollAnalyticsSerializer, PollAnalyticsListSerializer,
+    UserAnalyticsSerializer, AnalyticsEventSerializer,
     AnalyticsSnapshotSerializer, PollAnalyticsSummarySerializer,
     UserAnalyticsSummarySerializer, AnalyticsDashboardSerializer,
     ExportAnalyticsSerializer
 )
-from .services import AnalyticsService
+from .services import (
+    AnalyticsService, DASHBOARD_ADMIN_TIMEOUT, DASHBOARD_USER_TIMEOUT,
+    TREND_CACHE_KEY, TREND_CACHE_TIMEOUT
+)
+from .tasks import update_poll_analytics, update_user_analytics
 
 User = get_user_model()
 
+# Rows fetched per database round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the value back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def is_admin_user(user):
+    """Whether user sees analytics for everyone rather than just their own"""
+    return user.is_staff or user.is_superuser
+
 
 class IsOwnerOrStaff(permissions.BasePermission):
     """Custom permission for owners or staff"""
@@ -31,14 +61,15 @@ class IsOwnerOrStaff(permissions.BasePermission):
         return request.user and request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        if request.user.is_staff or request.user.is_superuser:
+        if is_admin_user(request.user):
             return True
 
-        # Check ownership based on model type
-        if hasattr(obj, 'poll') and hasattr(obj.poll, 'creator'):
-            return obj.poll.creator == request.user
-        elif hasattr(obj, 'user'):
-            return obj.user == request.user
+        # Check ownership based on model type; compare ids so the owner
+        # row is never loaded
+        if hasattr(obj, 'poll') and hasattr(obj.poll, 'creator_id'):
+            return obj.poll.creator_id == request.user.pk
+        elif hasattr(obj, 'user_id'):
+            return obj.user_id == request.user.pk
 
         return False
 
@@ -46,7 +77,7 @@ class IsOwnerOrStaff(permissions.BasePermission):
 class PollAnalyticsFilter(filters.FilterSet):
     """Filter set for poll analytics"""
 
-    poll_creator = filters.NumberFilter(field_name='poll__creator__id')
+    poll_creator = filters.NumberFilter(field_name='creator_id')
     poll_category = filters.NumberFilter(field_name='poll__category__id')
     is_paid = filters.BooleanFilter(field_name='poll__is_paid')
     min_votes = filters.NumberFilter(
@@ -76,36 +107,38 @@ class PollAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
                        'completion_rate', 'total_revenue', 'last_updated']
     ordering = ['-last_updated']
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PollAnalyticsListSerializer
+        return PollAnalyticsSerializer
+
     def get_queryset(self):
         """Filter queryset based on user permissions"""
-        if self.request.user.is_staff or self.request.user.is_superuser:
-            return PollAnalytics.objects.all().select_related('poll__creator')
-        else:
-            return PollAnalytics.objects.filter(
-                poll__creator=self.request.user
-            ).select_related('poll__creator')
+        queryset = self.get_serializer_class().setup_eager_loading(
+            PollAnalytics.objects.all())
+        if is_admin_user(self.request.user):
+            return queryset
+        return queryset.filter(creator=self.request.user)
 
     @action(detail=True, methods=['post'])
     def refresh(self, request, pk=None):
         """Manually refresh analytics for a specific poll"""
 
         analytics = self.get_object()
-        analytics_service = AnalyticsService()
-
-        success = analytics_service.update_poll_analytics(analytics.poll.id)
 
-        if success:
-            # Return updated data
-            analytics.refresh_from_db()
-            serializer = self.get_serializer(analytics)
-            return Response({
-                'message': 'Analytics refreshed successfully',
-                'data': serializer.data
-            })
-        else:
+        try:
+            update_poll_analytics.delay(analytics.poll_id)
+        except Exception:
             return Response({
-                'error': 'Failed to refresh analytics'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'error': 'Failed to queue analytics refresh'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # The worker recalculates in the background; return current data
+        serializer = self.get_serializer(analytics)
+        return Response({
+            'message': 'Analytics refresh queued',
+            'data': serializer.data
+        }, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -113,31 +146,15 @@ class PollAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
 
         queryset = self.filter_queryset(self.get_queryset())
 
-        # Calculate summary metrics
-        summary_data = []
-        for analytics in queryset:
-            # Find peak voting hour
-            votes_by_hour = analytics.votes_by_hour or {}
-            peak_hour = max(votes_by_hour.keys(
-            ), key=lambda k: votes_by_hour[k]) if votes_by_hour else 12
-
-            # Find top country
-            votes_by_country = analytics.votes_by_country or {}
-            top_country = max(votes_by_country.keys(
-            ), key=lambda k: votes_by_country[k]) if votes_by_country else 'XX'
-
-            summary_data.append({
-                'poll_id': analytics.poll.id,
-                'poll_title': analytics.poll.title,
-                'total_votes': analytics.total_votes,
-                'unique_voters': analytics.unique_voters,
-                'completion_rate': analytics.completion_rate,
-                'view_count': analytics.view_count,
-                'view_to_vote_rate': analytics.view_to_vote_rate,
-                'revenue': analytics.total_revenue,
-                'top_country': top_country,
-                'peak_voting_hour': int(peak_hour) if peak_hour.isdigit() else 12,
-            })
+        # Peak hour and top country are persisted by the refresh, so the
+        # summary is a plain column projection
+        summary_data = queryset.values(
+            'poll_id', 'total_votes', 'unique_voters', 'completion_rate',
+            'view_count', 'view_to_vote_rate', 'top_country',
+            'peak_voting_hour',
+            poll_title=F('poll__title'),
+            revenue=F('total_revenue'),
+        )
 
         serializer = PollAnalyticsSummarySerializer(summary_data, many=True)
         return Response(serializer.data)
@@ -156,33 +173,31 @@ class UserAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         """Filter queryset based on user permissions"""
-        if self.request.user.is_staff or self.request.user.is_superuser:
-            return UserAnalytics.objects.all().select_related('user')
-        else:
-            return UserAnalytics.objects.filter(
-                user=self.request.user
-            ).select_related('user')
+        queryset = self.get_serializer_class().setup_eager_loading(
+            UserAnalytics.objects.all())
+        if is_admin_user(self.request.user):
+            return queryset
+        return queryset.filter(user=self.request.user)
 
     @action(detail=True, methods=['post'])
     def refresh(self, request, pk=None):
         """Manually refresh analytics for a specific user"""
 
         analytics = self.get_object()
-        analytics_service = AnalyticsService()
-
-        success = analytics_service.update_user_analytics(analytics.user.id)
 
-        if success:
-            analytics.refresh_from_db()
-            serializer = self.get_serializer(analytics)
-            return Response({
-                'message': 'User analytics refreshed successfully',
-                'data': serializer.data
-            })
-        else:
+        try:
+            update_user_analytics.delay(analytics.user_id)
+        except Exception:
             return Response({
-                'error': 'Failed to refresh user analytics'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'error': 'Failed to queue analytics refresh'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # The worker recalculates in the background; return current data
+        serializer = self.get_serializer(analytics)
+        return Response({
+            'message': 'Analytics refresh queued',
+            'data': serializer.data
+        }, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
@@ -202,34 +217,35 @@ class UserAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # Only show public leaderboard unless user is staff
-        if not (request.user.is_staff or request.user.is_superuser):
+        is_admin = is_admin_user(request.user)
+        if not is_admin:
             # For non-staff, show anonymized data
             queryset = UserAnalytics.objects.all()
         else:
             queryset = self.get_queryset()
 
-        leaderboard = queryset.order_by(f'-{metric}')[:limit]
+        # Project only the returned columns, with the engagement score
+        # computed by the database
+        leaderboard = queryset.annotate(
+            engagement_score=Round(ENGAGEMENT_SCORE, 2)
+        ).order_by(f'-{metric}').values(
+            'user_id', 'user__username', 'polls_created', 'total_votes_made',
+            'total_votes_received', 'total_revenue', 'engagement_score',
+            'primary_country'
+        )[:limit]
 
         leaderboard_data = []
         for i, analytics in enumerate(leaderboard, 1):
-            # Calculate engagement score
-            engagement_score = (
-                analytics.polls_created * 10 +
-                analytics.total_votes_made * 2 +
-                analytics.bookmarks_made * 1 +
-                analytics.shares_made * 5
-            ) / 100.0
-
             data = {
                 'rank': i,
-                'user_id': analytics.user.id if request.user.is_staff else None,
-                'username': analytics.user.username if request.user.is_staff else f'User_{i}',
-                'polls_created': analytics.polls_created,
-                'total_votes_made': analytics.total_votes_made,
-                'total_votes_received': analytics.total_votes_received,
-                'total_revenue': analytics.total_revenue,
-                'engagement_score': round(engagement_score, 2),
-                'primary_country': analytics.primary_country,
+                'user_id': analytics['user_id'] if is_admin else None,
+                'username': analytics['user__username'] if is_admin else f'User_{i}',
+                'polls_created': analytics['polls_created'],
+                'total_votes_made': analytics['total_votes_made'],
+                'total_votes_received': analytics['total_votes_received'],
+                'total_revenue': analytics['total_revenue'],
+                'engagement_score': analytics['engagement_score'],
+                'primary_country': analytics['primary_country'],
             }
             leaderboard_data.append(data)
 
@@ -252,9 +268,8 @@ class AnalyticsEventViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         # Limit to recent events to prevent performance issues
         recent_date = timezone.now() - timedelta(days=30)
-        return AnalyticsEvent.objects.filter(
-            created_at__gte=recent_date
-        ).select_related('user', 'poll')
+        return self.get_serializer_class().setup_eager_loading(
+            AnalyticsEvent.objects.filter(created_at__gte=recent_date))
 
 
 class AnalyticsSnapshotViewSet(viewsets.ReadOnlyModelViewSet):
@@ -286,118 +301,72 @@ class AnalyticsDashboardView(APIView):
         comparison_start = start_date - timedelta(days=days)
 
         # Check if user can see all data or just their own
-        is_admin = request.user.is_staff or request.user.is_superuser
+        is_admin = is_admin_user(request.user)
+
+        analytics_service = AnalyticsService()
+        cache_key = analytics_service.dashboard_cache_key(
+            request.user.id, is_admin, days)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
 
         from apps.polls.models import Poll, Vote
 
         if is_admin:
             # System-wide metrics
-            current_polls = Poll.objects.filter(created_at__gte=start_date)
-            previous_polls = Poll.objects.filter(
-                created_at__gte=comparison_start,
-                created_at__lt=start_date
-            )
-
-            current_votes = Vote.objects.filter(created_at__gte=start_date)
-            previous_votes = Vote.objects.filter(
-                created_at__gte=comparison_start,
-                created_at__lt=start_date
-            )
-
-            current_users = User.objects.filter(date_joined__gte=start_date)
-            previous_users = User.objects.filter(
-                date_joined__gte=comparison_start,
-                date_joined__lt=start_date
-            )
+            polls = Poll.objects.all()
+            votes = Vote.objects.all()
+            users = User.objects.all()
+            transactions = Transaction.objects.all() if Transaction else None
         else:
             # User-specific metrics
-            current_polls = Poll.objects.filter(
-                creator=request.user,
-                created_at__gte=start_date
-            )
-            previous_polls = Poll.objects.filter(
-                creator=request.user,
-                created_at__gte=comparison_start,
-                created_at__lt=start_date
-            )
-
-            current_votes = Vote.objects.filter(
-                choice__question__poll__creator=request.user,
-                created_at__gte=start_date
-            )
-            previous_votes = Vote.objects.filter(
-                choice__question__poll__creator=request.user,
-                created_at__gte=comparison_start,
-                created_at__lt=start_date
-            )
-
-            current_users = User.objects.filter(id=request.user.id)
-            previous_users = User.objects.none()
-
-        # Calculate metrics
-        total_polls = current_polls.count()
-        total_votes = current_votes.count()
-        total_users = current_users.count()
-
-        # Calculate changes
-        prev_polls = previous_polls.count()
-        prev_votes = previous_votes.count()
-        prev_users = previous_users.count()
+            polls = Poll.objects.filter(creator=request.user)
+            votes = Vote.objects.filter(poll__creator=request.user)
+            users = None
+            transactions = Transaction.objects.filter(
+                poll__creator=request.user) if Transaction else None
+
+        # Each current/previous pair is one conditional aggregate
+        periods = (start_date, comparison_start)
+        total_polls, prev_polls = self._compare_periods(
+            polls, 'created_at', *periods)
+        total_votes, prev_votes = self._compare_periods(
+            votes, 'created_at', *periods)
+        if users is not None:
+            total_users, prev_users = self._compare_periods(
+                users, 'date_joined', *periods)
+        else:
+            total_users, prev_users = 1, 0
 
         polls_change = ((total_polls - prev_polls) / max(prev_polls, 1)) * 100
         votes_change = ((total_votes - prev_votes) / max(prev_votes, 1)) * 100
         users_change = ((total_users - prev_users) / max(prev_users, 1)) * 100
 
         # Revenue calculation
-        try:
-            from apps.payments.models import Transaction
-            if is_admin:
-                current_revenue = Transaction.objects.filter(
-                    created_at__gte=start_date,
-                    status='completed'
-                ).aggregate(total=Sum('amount'))['total'] or 0
-
-                previous_revenue = Transaction.objects.filter(
-                    created_at__gte=comparison_start,
-                    created_at__lt=start_date,
-                    status='completed'
-                ).aggregate(total=Sum('amount'))['total'] or 0
-            else:
-                current_revenue = Transaction.objects.filter(
-                    poll__creator=request.user,
-                    created_at__gte=start_date,
-                    status='completed'
-                ).aggregate(total=Sum('amount'))['total'] or 0
-
-                previous_revenue = Transaction.objects.filter(
-                    poll__creator=request.user,
-                    created_at__gte=comparison_start,
-                    created_at__lt=start_date,
-                    status='completed'
-                ).aggregate(total=Sum('amount'))['total'] or 0
-
+        current_revenue = revenue_change = 0
+        if transactions is not None:
+            current_revenue, previous_revenue = self._compare_periods(
+                transactions.filter(status='completed'), 'created_at',
+                *periods, aggregate=Sum, field='amount')
             revenue_change = (
                 (current_revenue - previous_revenue) / max(previous_revenue, 1)) * 100
-        except:
-            current_revenue = 0
-            revenue_change = 0
 
-        # Generate trend data
+        current_votes = votes.filter(created_at__gte=start_date)
+        if users is not None:
+            current_users = users.filter(date_joined__gte=start_date)
+        else:
+            current_users = User.objects.filter(id=request.user.id)
+
+        # Generate trend data; admins share the system-wide series
+        scope = 'all' if is_admin else request.user.id
         votes_trend = self._generate_trend_data(
-            current_votes, days, 'created_at')
+            current_votes, days, 'created_at', scope)
         user_growth = self._generate_trend_data(
-            current_users, days, 'date_joined')
+            current_users, days, 'date_joined', scope)
 
-        # Geographic distribution
-        geo_events = AnalyticsEvent.objects.filter(
-            created_at__gte=start_date
-        ).values('country_code').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-
-        geographic_distribution = {
-            item['country_code']: item['count'] for item in geo_events
-        }
+        # Geographic distribution, from the hourly per-day rollup
+        geographic_distribution = GeoDailyCount.objects.distribution(
+            timezone.localdate(start_date))
 
         # Top polls (for admins) or user's top polls
         if is_admin:
@@ -411,7 +380,7 @@ class AnalyticsDashboardView(APIView):
         else:
             top_polls = list(
                 PollAnalytics.objects.filter(
-                    poll__creator=request.user,
+                    creator=request.user,
                     last_updated__gte=start_date
                 ).order_by('-total_votes')[:5].values(
                     'poll__title', 'total_votes', 'unique_voters'
@@ -437,26 +406,44 @@ class AnalyticsDashboardView(APIView):
         }
 
         serializer = AnalyticsDashboardSerializer(dashboard_data)
+        cache.set(cache_key, dict(serializer.data), timeout=(
+            DASHBOARD_ADMIN_TIMEOUT if is_admin else DASHBOARD_USER_TIMEOUT))
         return Response(serializer.data)
 
-    def _generate_trend_data(self, queryset, days, date_field):
-        """Generate trend data for charts"""
-        from django.db.models import Count
-        from django.db.models.functions import TruncDate
+    def _compare_periods(self, queryset, date_field, start_date,
+                         comparison_start, aggregate=Count, field='id'):
+        """Aggregate over the current and the previous period in one query"""
+        current = Q(**{f'{date_field}__gte': start_date})
+        totals = queryset.filter(
+            **{f'{date_field}__gte': comparison_start}
+        ).aggregate(
+            current=aggregate(field, filter=current),
+            previous=aggregate(field, filter=~current),
+        )
+        return totals['current'] or 0, totals['previous'] or 0
 
-        trend_data = queryset.annotate(
-            date=TruncDate(date_field)
-        ).values('date').annotate(
-            count=Count('id')
-        ).order_by('date')
+    def _generate_trend_data(self, queryset, days, date_field, scope):
+        """Generate trend data for charts, cached per scope and range"""
+        from django.db.models.functions import TruncDate
 
-        # Convert to dict with date strings as keys
-        result = {}
-        for item in trend_data:
-            if item['date']:
-                result[item['date'].strftime('%Y-%m-%d')] = item['count']
+        def compute():
+            trend_data = queryset.annotate(
+                date=TruncDate(date_field)
+            ).values('date').annotate(
+                count=Count('id')
+            ).order_by('date')
+
+            # Convert to dict with date strings as keys
+            return {
+                item['date'].isoformat(): item['count']
+                for item in trend_data if item['date']
+            }
 
-        return result
+        return cache.get_or_set(
+            TREND_CACHE_KEY.format(
+                date_field=date_field, scope=scope, days=days),
+            compute, timeout=TREND_CACHE_TIMEOUT
+        )
 
 
 class ExportAnalyticsView(APIView):
@@ -476,7 +463,7 @@ class ExportAnalyticsView(APIView):
         export_format = data['export_format']
 
         # Check permissions
-        is_admin = request.user.is_staff or request.user.is_superuser
+        is_admin = is_admin_user(request.user)
 
         if export_type in ['user', 'events'] and not is_admin:
             return Response({
@@ -504,8 +491,8 @@ class ExportAnalyticsView(APIView):
         queryset = PollAnalytics.objects.all()
 
         # Apply filters
-        if not (request.user.is_staff or request.user.is_superuser):
-            queryset = queryset.filter(poll__creator=request.user)
+        if not is_admin_user(request.user):
+            queryset = queryset.filter(creator=request.user)
 
         if data.get('poll_ids'):
             queryset = queryset.filter(poll_id__in=data['poll_ids'])
@@ -516,62 +503,183 @@ class ExportAnalyticsView(APIView):
         if data.get('date_to'):
             queryset = queryset.filter(last_updated__lte=data['date_to'])
 
+        fields = [
+            'poll__title', 'poll__creator__username', 'total_votes',
+            'unique_voters', 'completion_rate', 'total_revenue',
+            'last_updated'
+        ]
         if export_format == 'csv':
-            return self._export_as_csv(queryset, 'poll_analytics.csv', [
-                'poll__title', 'poll__creator__username', 'total_votes',
-                'unique_voters', 'completion_rate', 'total_revenue',
-                'last_updated'
-            ])
+            return self._export_as_csv(queryset, 'poll_analytics.csv', fields)
+        elif export_format == 'xlsx':
+            return self._export_as_xlsx(queryset, 'poll_analytics.xlsx', fields)
         elif export_format == 'json':
-            serializer = PollAnalyticsSerializer(queryset, many=True)
-            return self._export_as_json(serializer.data, 'poll_analytics.json')
+            return self._export_as_json(queryset, 'poll_analytics.json', fields)
 
     def _export_user_analytics(self, request, data, export_format):
         """Export user analytics data"""
-        # Implementation similar to poll analytics
-        pass
+
+        queryset = UserAnalytics.objects.order_by('user_id')
+
+        # Apply filters
+        if not is_admin_user(request.user):
+            queryset = queryset.filter(user=request.user)
+
+        if data.get('user_ids'):
+            queryset = queryset.filter(user_id__in=data['user_ids'])
+
+        if data.get('date_from'):
+            queryset = queryset.filter(last_updated__gte=data['date_from'])
+
+        if data.get('date_to'):
+            queryset = queryset.filter(last_updated__lte=data['date_to'])
+
+        fields = [
+            'user__username', 'polls_created', 'active_polls', 'polls_voted',
+            'total_votes_made', 'total_votes_received', 'total_revenue',
+            'total_spent', 'primary_country', 'last_updated'
+        ]
+        if export_format == 'csv':
+            return self._export_as_csv(queryset, 'user_analytics.csv', fields)
+        elif export_format == 'xlsx':
+            return self._export_as_xlsx(queryset, 'user_analytics.xlsx', fields)
+        elif export_format == 'json':
+            return self._export_as_json(queryset, 'user_analytics.json', fields)
 
     def _export_analytics_events(self, request, data, export_format):
         """Export analytics events data"""
-        # Implementation similar to poll analytics
-        pass
+
+        queryset = AnalyticsEvent.objects.order_by('created_at')
+
+        if data.get('poll_ids'):
+            queryset = queryset.filter(poll_id__in=data['poll_ids'])
+
+        if data.get('user_ids'):
+            queryset = queryset.filter(user_id__in=data['user_ids'])
+
+        if data.get('date_from'):
+            queryset = queryset.filter(created_at__gte=data['date_from'])
+
+        if data.get('date_to'):
+            queryset = queryset.filter(created_at__lte=data['date_to'])
+
+        fields = [
+            'created_at', 'event_type', 'user__username', 'poll_id',
+            'ip_address', 'device_type', 'country_code', 'region', 'city'
+        ]
+        if data.get('include_metadata'):
+            fields.append('metadata')
+
+        if export_format == 'csv':
+            return self._export_as_csv(queryset, 'analytics_events.csv', fields)
+        elif export_format == 'xlsx':
+            return self._export_as_xlsx(queryset, 'analytics_events.xlsx', fields)
+        elif export_format == 'json':
+            return self._export_as_json(queryset, 'analytics_events.json', fields)
 
     def _export_compliance_logs(self, request, data, export_format):
         """Export compliance logs data"""
-        # Implementation similar to poll analytics
-        pass
+        from apps.compliance.models import ComplianceLog
 
-    def _export_as_csv(self, queryset, filename, fields):
-        """Export queryset as CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Compliance logs carry voter IPs; only staff see them
+        if not is_admin_user(request.user):
+            return Response({
+                'error': 'Compliance logs can only be exported by staff'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        queryset = ComplianceLog.objects.order_by('created_at')
+
+        if data.get('poll_ids'):
+            queryset = queryset.filter(poll_id__in=data['poll_ids'])
 
-        writer = csv.writer(response)
-
-        # Write headers
-        headers = [field.replace('__', '_').replace(
-            '_', ' ').title() for field in fields]
-        writer.writerow(headers)
-
-        # Write data
-        for obj in queryset:
-            row = []
-            for field in fields:
-                value = obj
-                for attr in field.split('__'):
-                    value = getattr(value, attr, '')
-                    if value is None:
-                        value = ''
-                row.append(str(value))
-            writer.writerow(row)
+        if data.get('user_ids'):
+            queryset = queryset.filter(user_id__in=data['user_ids'])
 
+        if data.get('date_from'):
+            queryset = queryset.filter(created_at__gte=data['date_from'])
+
+        if data.get('date_to'):
+            queryset = queryset.filter(created_at__lte=data['date_to'])
+
+        fields = [
+            'created_at', 'action', 'status', 'user__username', 'poll_id',
+            'ip_address', 'country_code', 'blocked_reason', 'request_path'
+        ]
+        if data.get('include_metadata'):
+            fields.append('metadata')
+
+        if export_format == 'csv':
+            return self._export_as_csv(queryset, 'compliance_logs.csv', fields)
+        elif export_format == 'xlsx':
+            return self._export_as_xlsx(queryset, 'compliance_logs.xlsx', fields)
+        elif export_format == 'json':
+            return self._export_as_json(
+                queryset, 'compliance_logs.json', fields)
+
+    def _export_rows(self, queryset, fields):
+        """Yield the header row, then one row per object, chunk by chunk"""
+        yield [field.replace('__', '_').replace('_', ' ').title()
+               for field in fields]
+
+        # values_list joins the related columns up front and iterator()
+        # keeps only one chunk of rows in memory
+        for values in queryset.values_list(*fields).iterator(
+                chunk_size=EXPORT_CHUNK_SIZE):
+            yield [self._export_value(value) for value in values]
+
+    def _export_value(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        return str(value)
+
+    def _export_as_csv(self, queryset, filename, fields):
+        """Stream queryset as CSV"""
+        writer = csv.writer(Echo())
+        response = StreamingHttpResponse(
+            (writer.writerow(row)
+             for row in self._export_rows(queryset, fields)),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
-    def _export_as_json(self, data, filename):
-        """Export data as JSON"""
-        response = HttpResponse(
-            json.dumps(data, indent=2, default=str),
-            content_type='application/json'
+    def _export_as_xlsx(self, queryset, filename, fields):
+        """Export queryset as an Excel workbook"""
+        from openpyxl import Workbook
+
+        # Write-only worksheets flush rows to disk as they are appended
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        for row in self._export_rows(queryset, fields):
+            worksheet.append(row)
+
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument'
+                         '.spreadsheetml.sheet'
         )
+
+    def _export_as_json(self, queryset, filename, fields):
+        """Stream the selected columns as a JSON array of objects"""
+
+        def stream():
+            # Plain dicts from values() skip model and serializer
+            # instances; each chunk is encoded in a single dumps() call
+            rows = queryset.values(*fields).iterator(
+                chunk_size=EXPORT_CHUNK_SIZE)
+            separator = b'['
+            while batch := list(islice(rows, EXPORT_CHUNK_SIZE)):
+                yield separator + dumps(batch)[1:-1]
+                separator = b','
+            yield b'[]' if separator == b'[' else b']'
+
+        response = StreamingHttpResponse(
+            stream(), content_type='application/json')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
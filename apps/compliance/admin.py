@@ -1,10 +1,26 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.utils.html import format_html
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.db.models import Count
+from django.db.models.functions import Substr
 from .models import ComplianceLog, GeolocationCache, ComplianceRule
 
 
+class ComplianceLogChangeList(ChangeList):
+    """Load only the columns the changelist shows, not metadata or UA
+
+    Reasons are cut to the displayed length in the database.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).only(
+            'created_at', 'action', 'status', 'ip_address', 'country_code',
+            'poll__title', 'user__username'
+        ).annotate(_reason_short=Substr('blocked_reason', 1, 51))
+
+
 @admin.register(ComplianceLog)
 class ComplianceLogAdmin(admin.ModelAdmin):
     list_display = [
@@ -21,33 +37,48 @@ class ComplianceLogAdmin(admin.ModelAdmin):
         'created_at', 'poll', 'user', 'ip_address', 'action', 'status',
         'country_code', 'blocked_reason', 'metadata', 'request_path', 'user_agent'
     ]
+    list_select_related = ['poll', 'user']
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
 
+    def get_changelist(self, request, **kwargs):
+        return ComplianceLogChangeList
+
     def has_add_permission(self, request):
         return False  # Logs are created automatically
 
     def has_change_permission(self, request, obj=None):
         return False  # Logs should not be modified
 
+    # Change URLs are reversed once and filled in per row
+    @cached_property
+    def _poll_url(self):
+        return reverse('admin:polls_poll_change', args=[0]).replace(
+            '/0/', '/{}/')
+
+    @cached_property
+    def _user_url(self):
+        return reverse('admin:core_user_change', args=[0]).replace(
+            '/0/', '/{}/')
+
     def poll_link(self, obj):
-        if obj.poll:
-            url = reverse('admin:polls_poll_change', args=[obj.poll.id])
+        if obj.poll_id:
+            url = self._poll_url.format(obj.poll_id)
             return format_html('<a href="{}">{}</a>', url, obj.poll.title)
         return '-'
     poll_link.short_description = 'Poll'
 
     def user_link(self, obj):
-        if obj.user:
-            url = reverse('admin:core_user_change', args=[obj.user.id])
+        if obj.user_id:
+            url = self._user_url.format(obj.user_id)
             return format_html('<a href="{}">{}</a>', url, obj.user.username)
         return '-'
     user_link.short_description = 'User'
 
     def blocked_reason_short(self, obj):
-        if len(obj.blocked_reason) > 50:
-            return obj.blocked_reason[:50] + '...'
-        return obj.blocked_reason
+        if len(obj._reason_short) > 50:
+            return obj._reason_short[:50] + '...'
+        return obj._reason_short
     blocked_reason_short.short_description = 'Reason'
 
 
@@ -82,7 +113,7 @@ class GeolocationCacheAdmin(admin.ModelAdmin):
         from django.utils import timezone
         expired_count = GeolocationCache.objects.filter(
             expires_at__lt=timezone.now()
-        ).delete()[0]
+        ).delete_in_batches()
 
         self.message_user(
             request,
@@ -124,11 +155,13 @@ class ComplianceRuleAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
     def specific_polls_count(self, obj):
-        return obj.specific_polls.count()
+        return obj._specific_polls_count
     specific_polls_count.short_description = 'Specific Polls'
+    specific_polls_count.admin_order_field = '_specific_polls_count'
 
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('specific_polls')
+        return super().get_queryset(request).annotate(
+            _specific_polls_count=Count('specific_polls'))
 
 
 # Add some custom admin views for reports
@@ -137,7 +170,8 @@ class ComplianceReportView:
 
     def compliance_stats_view(self, request):
         from django.shortcuts import render
-        from django.db.models import Count
+        from django.db.models import Count, Q
+        from django.db.models.functions import TruncDate
         from datetime import timedelta
         from django.utils import timezone
 
@@ -148,12 +182,12 @@ class ComplianceReportView:
         logs = ComplianceLog.objects.filter(created_at__gte=start_date)
 
         # Calculate stats
-        stats = {
-            'total_logs': logs.count(),
-            'blocked_requests': logs.filter(status='blocked').count(),
-            'allowed_requests': logs.filter(status='allowed').count(),
-            'flagged_requests': logs.filter(status='flagged').count(),
-        }
+        stats = logs.aggregate(
+            total_logs=Count('id'),
+            blocked_requests=Count('id', filter=Q(status='blocked')),
+            allowed_requests=Count('id', filter=Q(status='allowed')),
+            flagged_requests=Count('id', filter=Q(status='flagged')),
+        )
 
         # Top countries
         top_countries = logs.values('country_code').annotate(
@@ -161,11 +195,11 @@ class ComplianceReportView:
         ).order_by('-count')[:10]
 
         # Daily breakdown
-        daily_stats = logs.extra(
-            select={'day': 'date(created_at)'}
+        daily_stats = logs.annotate(
+            day=TruncDate('created_at')
         ).values('day').annotate(
             total=Count('id'),
-            blocked=Count('id', filter=models.Q(status='blocked'))
+            blocked=Count('id', filter=Q(status='blocked'))
         ).order_by('day')
 
         context = {
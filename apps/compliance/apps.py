@@ -8,7 +8,4 @@ class ComplianceConfig(AppConfig):
 
     def ready(self):
         """Import signals when the app is ready"""
-        try:
-            import apps.compliance.signals  # noqa
-        except ImportError:
-            pass
+        import apps.compliance.signals  # noqa
@@ -47,17 +47,21 @@ class Command(BaseCommand):
         cutoff_date = timezone.now() - timedelta(days=retention_days)
 
         old_logs = ComplianceLog.objects.filter(created_at__lt=cutoff_date)
-        count = old_logs.count()
 
         if options['dry_run']:
             self.stdout.write(
                 self.style.WARNING(
-                    f'DRY RUN: Would delete {count} compliance logs older than {retention_days} days'
+                    f'DRY RUN: Would delete {old_logs.count()} compliance logs older than {retention_days} days'
                 )
             )
         else:
-            if count > 0:
-                deleted_count = old_logs.delete()[0]
+            dropped = ComplianceLog.objects.drop_partitions_before(cutoff_date)
+            ComplianceLog.objects.ensure_partitions()
+            for name in dropped:
+                self.stdout.write(f'Dropped partition {name}')
+
+            deleted_count = old_logs.delete_in_batches()
+            if deleted_count > 0:
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'Successfully deleted {deleted_count} old compliance logs'
@@ -73,17 +77,16 @@ class Command(BaseCommand):
         expired_cache = GeolocationCache.objects.filter(
             expires_at__lt=timezone.now()
         )
-        count = expired_cache.count()
 
         if options['dry_run']:
             self.stdout.write(
                 self.style.WARNING(
-                    f'DRY RUN: Would delete {count} expired geolocation cache entries'
+                    f'DRY RUN: Would delete {expired_cache.count()} expired geolocation cache entries'
                 )
             )
         else:
-            if count > 0:
-                deleted_count = expired_cache.delete()[0]
+            deleted_count = expired_cache.delete_in_batches()
+            if deleted_count > 0:
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'Successfully deleted {deleted_count} expired cache entries'
@@ -1,29 +1,38 @@
 import logging
+import re
+from django.core.cache import cache
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
 from .services import ComplianceService
 
 logger = logging.getLogger(__name__)
 
+POLL_CACHE_TTL = 60  # Votes hit the same polls repeatedly
+
+# Path fragments checked on every request, each folded into one regex
+VOTING_PATH_RE = re.compile(
+    r'/api/v1/polls/|/vote/|/submit-vote/', re.IGNORECASE)
+AUTH_PATH_RE = re.compile(r'/auth/|/login/|/register/|/token/')
+
+# The service is stateless, so both middlewares share one instance
+_compliance_service = ComplianceService()
+
 
 class GeoRestrictionMiddleware(MiddlewareMixin):
     """Middleware to enforce geographic restrictions on polls"""
 
-    def __init__(self, get_response=None):
-        super().__init__(get_response)
-        self.compliance_service = ComplianceService()
+    compliance_service = _compliance_service
 
-    def process_request(self, request):
-        """Process request before it reaches the view"""
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Process request once URL resolution has picked the view"""
 
         # Only check poll-related endpoints that involve voting
-        if not self._should_check_restrictions(request):
+        if not view_kwargs or not self._should_check_restrictions(request):
             return None
 
         try:
-            # Extract poll information from URL
-            poll_info = self._extract_poll_info(request)
+            # Extract poll information from the resolved URL
+            poll_info = self._extract_poll_info(view_kwargs)
             if not poll_info:
                 return None
 
@@ -32,10 +41,8 @@ class GeoRestrictionMiddleware(MiddlewareMixin):
                 return None
 
             # Get the poll object
-            from apps.polls.models import Poll
-            try:
-                poll = Poll.objects.get(id=poll_id)
-            except Poll.DoesNotExist:
+            poll = self._get_poll(poll_id)
+            if poll is None:
                 return None
 
             # Get client IP and user
@@ -95,100 +102,86 @@ class GeoRestrictionMiddleware(MiddlewareMixin):
 
         return None
 
-    def _should_check_restrictions(self, request) -> bool:
-        """Determine if the request should be checked for restrictions"""
+    def _get_poll(self, poll_id):
+        """Load the poll fields the checks need, cached briefly"""
+        from apps.polls.models import Poll
 
-        # Check if it's a voting endpoint
-        voting_patterns = [
-            '/api/v1/polls/',
-            '/vote/',
-            '/submit-vote/',
-        ]
+        key = f'compliance:poll:{poll_id}'
+        poll = cache.get(key)
+        if poll is None:
+            try:
+                poll = Poll.objects.only('id', 'allows_revote').get(id=poll_id)
+            except (Poll.DoesNotExist, ValueError):
+                return None
+            cache.set(key, poll, POLL_CACHE_TTL)
+        return poll
 
-        path = request.path.lower()
+    def _should_check_restrictions(self, request) -> bool:
+        """Determine if the request should be checked for restrictions"""
 
-        # Must be a POST request for voting
+        # Must be a POST request to a voting endpoint
         if request.method != 'POST':
             return False
 
-        # Check if path contains voting patterns
-        for pattern in voting_patterns:
-            if pattern in path:
-                return True
-
-        return False
-
-    def _extract_poll_info(self, request) -> dict:
-        """Extract poll information from the request"""
-        try:
-            # Try to resolve the URL to get parameters
-            resolver_match = resolve(request.path)
-            if resolver_match and 'poll_id' in resolver_match.kwargs:
-                return {'poll_id': resolver_match.kwargs['poll_id']}
+        return VOTING_PATH_RE.search(request.path) is not None
 
-            # Fallback: parse URL manually
-            path_parts = request.path.strip('/').split('/')
-
-            if 'polls' in path_parts:
-                poll_index = path_parts.index('polls')
-                if len(path_parts) > poll_index + 1:
-                    poll_id = path_parts[poll_index + 1]
-                    try:
-                        return {'poll_id': int(poll_id)}
-                    except ValueError:
-                        pass
-
-            return {}
-
-        except Exception as e:
-            logger.error(f"Error extracting poll info: {e}")
-            return {}
+    def _extract_poll_info(self, view_kwargs) -> dict:
+        """Extract poll information from the resolved URL kwargs"""
+        poll_id = view_kwargs.get('poll_id') or view_kwargs.get('pk')
+        return {'poll_id': poll_id} if poll_id else {}
 
 
 class ComplianceLoggingMiddleware(MiddlewareMixin):
     """Middleware to log all requests for compliance auditing"""
 
-    def __init__(self, get_response=None):
-        super().__init__(get_response)
-        self.compliance_service = ComplianceService()
+    compliance_service = _compliance_service
+
+    def process_request(self, request):
+        """Decide once whether to log, and open the request's state"""
+        request._compliance_log = self._should_log_request(request)
+        if request._compliance_log:
+            self.compliance_service.start_request()
 
     def process_response(self, request, response):
         """Log request information after processing"""
 
         # Only log specific endpoints for compliance
-        if self._should_log_request(request):
-            try:
-                ip_address = self.compliance_service.get_client_ip(request)
-                user = request.user if request.user.is_authenticated else None
-
-                # Determine action based on response status
-                if response.status_code >= 400:
-                    action = 'request_blocked'
-                    status = 'blocked'
-                    reason = f"HTTP {response.status_code}"
-                else:
-                    action = 'request_allowed'
-                    status = 'allowed'
-                    reason = "Request processed successfully"
-
-                self.compliance_service.log_compliance_action(
-                    action=action,
-                    user=user,
-                    ip_address=ip_address,
-                    status=status,
-                    reason=reason,
-                    request_path=request.path,
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    metadata={
-                        'method': request.method,
-                        'status_code': response.status_code,
-                        'content_type': response.get('Content-Type', ''),
-                    }
-                )
+        if not getattr(request, '_compliance_log', False):
+            return response
 
-            except Exception as e:
-                logger.error(f"Error in ComplianceLoggingMiddleware: {e}")
+        try:
+            ip_address = self.compliance_service.get_client_ip(request)
+            user = request.user if request.user.is_authenticated else None
 
+            # Determine action based on response status
+            if response.status_code >= 400:
+                action = 'request_blocked'
+                status = 'blocked'
+                reason = f"HTTP {response.status_code}"
+            else:
+                action = 'request_allowed'
+                status = 'allowed'
+                reason = "Request processed successfully"
+
+            self.compliance_service.log_compliance_action(
+                action=action,
+                user=user,
+                ip_address=ip_address,
+                status=status,
+                reason=reason,
+                request_path=request.path,
+                user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                metadata={
+                    'method': request.method,
+                    'status_code': response.status_code,
+                    'content_type': response.get('Content-Type', ''),
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Error in ComplianceLoggingMiddleware: {e}")
+
+        self.compliance_service.finish_request()
         return response
 
     def _should_log_request(self, request) -> bool:
@@ -199,9 +192,4 @@ class ComplianceLoggingMiddleware(MiddlewareMixin):
             return True
 
         # Log authentication-related requests
-        auth_patterns = ['/auth/', '/login/', '/register/', '/token/']
-        for pattern in auth_patterns:
-            if pattern in request.path:
-                return True
-
-        return False
+        return AUTH_PATH_RE.search(request.path) is not None
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0001_initial'),
+        ('polls', '0005_vote_poll'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compliancelog',
+            index=models.Index(fields=['created_at'], name='cl_created_at'),
+        ),
+    ]
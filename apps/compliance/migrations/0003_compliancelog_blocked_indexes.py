@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0002_compliancelog_created_at_index'),
+        ('polls', '0005_vote_poll'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compliancelog',
+            index=models.Index(condition=models.Q(('status', 'blocked')), fields=['country_code', 'created_at'], name='cl_blocked_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancelog',
+            index=models.Index(condition=models.Q(('status', 'blocked')), fields=['action', 'created_at'], name='cl_blocked_action_idx'),
+        ),
+    ]
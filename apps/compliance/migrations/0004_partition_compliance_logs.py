@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-16 00:40
+
+from django.db import migrations
+
+from apps.core.partitions import rebuild_table
+
+
+TABLE = 'compliance_compliancelog'
+
+
+def partition_logs(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        rebuild_table(schema_editor, TABLE, partitioned=True)
+
+
+def unpartition_logs(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        rebuild_table(schema_editor, TABLE, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0003_compliancelog_blocked_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_logs, unpartition_logs),
+    ]
@@ -1,7 +1,12 @@
-from django.db import models
+import json
+
+from django.db import connections, models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from apps.core.partitions import MonthlyPartitionManager
+from apps.core.querysets import BatchDeleteQuerySet
+
 User = get_user_model()
 
 
@@ -57,6 +62,9 @@ class ComplianceLog(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Monthly created_at partitions on PostgreSQL; see migration 0004
+    objects = MonthlyPartitionManager.from_queryset(BatchDeleteQuerySet)()
+
     class Meta:
         verbose_name = "Compliance Log"
         verbose_name_plural = "Compliance Logs"
@@ -67,12 +75,56 @@ class ComplianceLog(models.Model):
             models.Index(fields=['country_code', 'action']),
             models.Index(fields=['ip_address', 'created_at']),
             models.Index(fields=['user', 'action']),
+            # Retention cleanup and the newest-first listings
+            models.Index(fields=['created_at'], name='cl_created_at'),
+            # Report top-N of blocked requests; partial where supported
+            models.Index(fields=['country_code', 'created_at'],
+                         condition=models.Q(status='blocked'),
+                         name='cl_blocked_country_idx'),
+            models.Index(fields=['action', 'created_at'],
+                         condition=models.Q(status='blocked'),
+                         name='cl_blocked_action_idx'),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return f"{self.action} - {self.ip_address} - {self.status}"
 
+    # Columns written by copy_log, in COPY order
+    COPY_COLUMNS = (
+        'poll_id', 'user_id', 'ip_address', 'user_agent', 'request_path',
+        'action', 'status', 'country_code', 'blocked_reason', 'metadata',
+        'created_at',
+    )
+
+    @classmethod
+    def copy_log(cls, logs, using='default'):
+        """Insert unsaved logs, via COPY FROM STDIN on PostgreSQL"""
+        connection = connections[using]
+        if connection.vendor != 'postgresql':
+            return len(cls.objects.using(using).bulk_create(
+                logs, batch_size=500))
+
+        now = timezone.now()
+        rows = []
+        for log in logs:
+            values = {column: getattr(log, column)
+                      for column in cls.COPY_COLUMNS}
+            values['metadata'] = json.dumps(log.metadata or {})
+            values['created_at'] = log.created_at or now
+            rows.append(tuple(values.values()))
+
+        quote = connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            quote(cls._meta.db_table),
+            ', '.join(quote(column) for column in cls.COPY_COLUMNS)
+        )
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        return len(rows)
+
 
 class GeolocationCache(models.Model):
     """Cache for IP geolocation data to reduce API calls"""
@@ -94,6 +146,8 @@ class GeolocationCache(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField()
 
+    objects = BatchDeleteQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Geolocation Cache"
         verbose_name_plural = "Geolocation Cache"
@@ -1,13 +1,37 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from typing import Optional, Dict, Any
 from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
 from django.conf import settings
+from apps.core.querysets import upsert_unique_fields
+from apps.core.writers import BatchWriter
 from .models import GeolocationCache, ComplianceLog
 
 logger = logging.getLogger(__name__)
 
+# State of the request ComplianceLoggingMiddleware is handling: logs held
+# until the response goes out, and the locations already looked up
+_request_state = threading.local()
+
+# Resolved locations, in front of the GeolocationCache table
+GEOIP_CACHE_KEY = 'geoip:{ip}'
+GEOIP_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Concurrent provider requests when refreshing a batch of IPs
+GEOIP_FETCH_WORKERS = 16
+
+# COMPLIANCE_ASYNC_LOGS hands request logs to a writer thread
+LOG_QUEUE_MAXSIZE = 10000
+LOG_QUEUE_BATCH_SIZE = 500
+
+_log_writer = BatchWriter(
+    'compliance-logs', ComplianceLog.copy_log, 'compliance logs',
+    maxsize=LOG_QUEUE_MAXSIZE, batch_size=LOG_QUEUE_BATCH_SIZE)
+
 
 class GeolocationService:
     """Service for handling IP geolocation with caching and fallback providers"""
@@ -32,16 +56,42 @@ class GeolocationService:
             settings, 'GEOLOCATION_PROVIDERS', self.DEFAULT_PROVIDERS)
 
     def get_location_data(self, ip_address: str) -> Optional[Dict[str, Any]]:
-        """Get geolocation data for an IP address with caching"""
-
-        # Check database cache first
+        """Get geolocation data for an IP address with caching
+
+        Within a request the result is reused, so the geo check and the
+        vote session signal resolve the client IP once.
+        """
+        locations = getattr(_request_state, 'locations', None)
+        if locations is not None and ip_address in locations:
+            return locations[ip_address]
+
+        location_data = self._lookup_location(ip_address)
+        if locations is not None:
+            locations[ip_address] = location_data
+        return location_data
+
+    def peek_location(self, ip_address: str) -> Optional[Dict[str, Any]]:
+        """Location already resolved in this request or cached, else None"""
+        locations = getattr(_request_state, 'locations', None)
+        if locations and ip_address in locations:
+            return locations[ip_address]
+        return cache.get(GEOIP_CACHE_KEY.format(ip=ip_address))
+
+    def _lookup_location(self, ip_address: str) -> Dict[str, Any]:
+        """Resolve an IP from the caches, then the providers"""
+        key = GEOIP_CACHE_KEY.format(ip=ip_address)
+        location_data = cache.get(key)
+        if location_data is not None:
+            return location_data
+
+        # Then the database cache, copied up for its remaining lifetime
         try:
             cached = GeolocationCache.objects.get(
                 ip_address=ip_address,
                 is_valid=True
             )
             if not cached.is_expired():
-                return {
+                location_data = {
                     'country_code': cached.country_code,
                     'country_name': cached.country_name,
                     'region': cached.region,
@@ -50,25 +100,80 @@ class GeolocationService:
                     'longitude': cached.longitude,
                     'cached': True
                 }
+                remaining = cached.expires_at - timezone.now()
+                cache.set(key, location_data,
+                          int(remaining.total_seconds()))
+                return location_data
         except GeolocationCache.DoesNotExist:
             pass
 
-        # Try each provider
+        data, provider = self._fetch_location(ip_address)
+        if data:
+            # Cache the result
+            self._cache_location_data(ip_address, data, provider)
+            return data
+
+        # Return default if all providers fail
+        return self._get_default_location()
+
+    def refresh_locations(self, ip_addresses) -> int:
+        """Resolve the IPs not cached yet; returns how many were fetched
+
+        Cached IPs are filtered out with one cache read and one query, the
+        providers are called in parallel and the rows written in one upsert.
+        """
+        keys = {GEOIP_CACHE_KEY.format(ip=ip): ip for ip in set(ip_addresses)}
+        missing = {keys[key] for key in keys.keys() - cache.get_many(keys)}
+        if missing:
+            missing -= set(GeolocationCache.objects.filter(
+                ip_address__in=missing,
+                is_valid=True,
+                expires_at__gt=timezone.now()
+            ).values_list('ip_address', flat=True))
+        if not missing:
+            return 0
+
+        missing = list(missing)
+        workers = min(GEOIP_FETCH_WORKERS, len(missing))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = [
+                (ip, data, provider) for ip, (data, provider)
+                in zip(missing, executor.map(self._fetch_location, missing))
+                if data
+            ]
+        if not fetched:
+            return 0
+
+        unique_fields = upsert_unique_fields(connection, ['ip_address'])
+
+        GeolocationCache.objects.bulk_create(
+            [GeolocationCache(ip_address=ip,
+                              **self._cache_fields(data, provider))
+             for ip, data, provider in fetched],
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=[
+                'country_code', 'country_name', 'region', 'city', 'latitude',
+                'longitude', 'provider', 'is_valid', 'expires_at', 'updated_at'
+            ]
+        )
+        cache.set_many({
+            GEOIP_CACHE_KEY.format(ip=ip): {**data, 'cached': True}
+            for ip, data, _ in fetched
+        }, GEOIP_CACHE_TIMEOUT)
+        return len(fetched)
+
+    def _fetch_location(self, ip_address: str):
+        """First provider answer for an IP, as (data, provider name)"""
         for provider in self.providers:
             try:
                 data = self._fetch_from_provider(ip_address, provider)
                 if data:
-                    # Cache the result
-                    self._cache_location_data(
-                        ip_address, data, provider['name'])
-                    return data
+                    return data, provider['name']
             except Exception as e:
                 logger.warning(
                     f"Geolocation provider {provider['name']} failed: {e}")
-                continue
-
-        # Return default if all providers fail
-        return self._get_default_location()
+        return None, None
 
     def _fetch_from_provider(self, ip_address: str, provider: Dict) -> Optional[Dict]:
         """Fetch data from a specific provider"""
@@ -112,21 +217,27 @@ class GeolocationService:
         try:
             GeolocationCache.objects.update_or_create(
                 ip_address=ip_address,
-                defaults={
-                    'country_code': data.get('country_code', 'XX'),
-                    'country_name': data.get('country_name', ''),
-                    'region': data.get('region', ''),
-                    'city': data.get('city', ''),
-                    'latitude': data.get('latitude'),
-                    'longitude': data.get('longitude'),
-                    'provider': provider,
-                    'is_valid': True,
-                    'expires_at': timezone.now() + timezone.timedelta(hours=24)
-                }
+                defaults=self._cache_fields(data, provider)
             )
+            cache.set(GEOIP_CACHE_KEY.format(ip=ip_address),
+                      {**data, 'cached': True}, GEOIP_CACHE_TIMEOUT)
         except Exception as e:
             logger.error(f"Error caching geolocation data: {e}")
 
+    def _cache_fields(self, data: Dict, provider: str) -> Dict:
+        """GeolocationCache field values for a provider answer"""
+        return {
+            'country_code': data.get('country_code', 'XX'),
+            'country_name': data.get('country_name', ''),
+            'region': data.get('region', ''),
+            'city': data.get('city', ''),
+            'latitude': data.get('latitude'),
+            'longitude': data.get('longitude'),
+            'provider': provider,
+            'is_valid': True,
+            'expires_at': timezone.now() + timezone.timedelta(hours=24)
+        }
+
     def _get_default_location(self) -> Dict:
         """Return default location when all providers fail"""
         return {
@@ -237,9 +348,9 @@ class ComplianceService:
                               status: str = 'blocked', reason: str = '',
                               metadata: Dict = None, request_path: str = '',
                               user_agent: str = ''):
-        """Log a compliance action"""
+        """Log a compliance action, held for the batch when one is open"""
         try:
-            ComplianceLog.objects.create(
+            log = ComplianceLog(
                 poll=poll,
                 user=user,
                 ip_address=ip_address,
@@ -251,19 +362,49 @@ class ComplianceService:
                 request_path=request_path,
                 user_agent=user_agent
             )
+            pending = getattr(_request_state, 'pending', None)
+            if pending is not None:
+                pending.append(log)
+            else:
+                log.save()
         except Exception as e:
             logger.error(f"Error logging compliance action: {e}")
 
+    def start_request(self):
+        """Hold this thread's logs and lookups until finish_request"""
+        _request_state.pending = []
+        _request_state.locations = {}
+
+    def finish_request(self):
+        """Write the held logs in one batch, or hand them to the writer"""
+        logs = getattr(_request_state, 'pending', None)
+        _request_state.pending = None
+        _request_state.locations = None
+        if not logs:
+            return
+
+        if settings.COMPLIANCE_ASYNC_LOGS:
+            # When the writer is behind, insert inline rather than drop it
+            logs = [log for log in logs if not _log_writer.put(log)]
+
+        if logs:
+            _log_writer.write(logs)
+
     def get_client_ip(self, request) -> str:
-        """Extract client IP from request"""
+        """Extract client IP from request, parsed once per request"""
+        ip = getattr(request, '_client_ip', None)
+        if ip is not None:
+            return ip
+
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
+            ip = x_forwarded_for.partition(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR', '')
 
         # Handle localhost/development
-        if ip in ['127.0.0.1', '::1', 'localhost']:
-            return '8.8.8.8'  # Use public IP for testing
+        if ip in ('127.0.0.1', '::1', 'localhost'):
+            ip = '8.8.8.8'  # Use public IP for testing
 
+        request._client_ip = ip
         return ip
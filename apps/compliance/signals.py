@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.signals import user_logged_in
@@ -49,18 +50,30 @@ def track_user_login_location(sender, user, request, **kwargs):
 
 @receiver(post_save, sender=VoteSession)
 def update_session_geolocation(sender, instance, created, **kwargs):
-    """Update vote session with geolocation data"""
-    if created and not instance.country_code:
-        try:
-            geo_service = GeolocationService()
-            location_data = geo_service.get_location_data(instance.ip_address)
+    """Fill in the vote session's country without holding up the vote
 
-            # Update the session with country code
+    A location the request already resolved is used directly; otherwise a
+    worker looks it up, since the providers can take seconds.
+    """
+    if not created or instance.country_code:
+        return
+
+    try:
+        location_data = GeolocationService().peek_location(
+            instance.ip_address)
+        if location_data:
             instance.country_code = location_data.get('country_code', 'XX')
-            instance.save(update_fields=['country_code'])
+            VoteSession.objects.filter(pk=instance.pk).update(
+                country_code=instance.country_code)
+            return
+
+        from .tasks import resolve_vote_session_geo
+        session_id = instance.pk
+        transaction.on_commit(
+            lambda: resolve_vote_session_geo.delay(session_id), robust=True)
 
-        except Exception as e:
-            # Don't break the voting flow
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Failed to update session geolocation: {e}")
+    except Exception as e:
+        # Don't break the voting flow
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.warning(f"Failed to update session geolocation: {e}")
@@ -1,10 +1,15 @@
 from celery import shared_task
+from django.db import InterfaceError, OperationalError
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Transient failures worth retrying; anything else fails the same way again
+RETRIABLE_ERRORS = (OperationalError, InterfaceError, ConnectionError,
+                    TimeoutError)
+
 
 @shared_task
 def cleanup_expired_geolocation_cache():
@@ -14,7 +19,7 @@ def cleanup_expired_geolocation_cache():
 
         deleted_count = GeolocationCache.objects.filter(
             expires_at__lt=timezone.now()
-        ).delete()[0]
+        ).delete_in_batches()
 
         logger.info(
             f"Cleaned up {deleted_count} expired geolocation cache entries")
@@ -36,72 +41,96 @@ def cleanup_old_compliance_logs():
             settings, 'COMPLIANCE_LOG_RETENTION_DAYS', 180)
         cutoff_date = timezone.now() - timedelta(days=retention_days)
 
+        # On PostgreSQL whole expired months go as a single DROP TABLE;
+        # the batches below only see the month straddling the cutoff
+        partitions_dropped = len(
+            ComplianceLog.objects.drop_partitions_before(cutoff_date))
+        ComplianceLog.objects.ensure_partitions()
+
         deleted_count = ComplianceLog.objects.filter(
             created_at__lt=cutoff_date
-        ).delete()[0]
+        ).delete_in_batches()
 
-        logger.info(f"Cleaned up {deleted_count} old compliance logs")
-        return {"status": "success", "deleted_count": deleted_count}
+        logger.info(
+            f"Cleaned up {deleted_count} old compliance logs, "
+            f"dropped {partitions_dropped} partitions")
+        return {
+            "status": "success",
+            "deleted_count": deleted_count,
+            "partitions_dropped": partitions_dropped
+        }
 
     except Exception as exc:
         logger.error(f"Error cleaning up compliance logs: {exc}")
         return {"status": "error", "error": str(exc)}
 
 
-@shared_task(bind=True, max_retries=3)
+@shared_task(bind=True, autoretry_for=RETRIABLE_ERRORS,
+             retry_kwargs={'max_retries': 3}, retry_backoff=60,
+             retry_backoff_max=600, retry_jitter=True)
 def perform_compliance_check(self, poll_id, user_id=None, ip_address=''):
     """Asynchronously perform compliance checks"""
-    try:
-        from .services import ComplianceService
-        from apps.polls.models import Poll
-        from django.contrib.auth import get_user_model
-
-        User = get_user_model()
-
-        # Get objects
-        try:
-            poll = Poll.objects.get(id=poll_id)
-        except Poll.DoesNotExist:
-            raise Exception(f"Poll with id {poll_id} not found")
-
-        user = None
-        if user_id:
-            try:
-                user = User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                pass
-
-        compliance_service = ComplianceService()
-
-        # Perform checks
-        geo_result = compliance_service.check_geographic_restrictions(
-            poll=poll,
-            ip_address=ip_address,
-            user=user
-        )
-
-        voting_result = compliance_service.check_voting_limits(
-            poll=poll,
-            user=user,
-            ip_address=ip_address
-        )
-
-        result = {
-            "status": "success",
-            "poll_id": poll_id,
-            "user_id": user_id,
-            "geographic_check": geo_result,
-            "voting_check": voting_result,
-            "overall_allowed": not (geo_result['blocked'] or voting_result['blocked'])
-        }
-
-        logger.info(
-            f"Compliance check completed for poll_id: {poll_id}, user_id: {user_id}")
-        return result
-
-    except Exception as exc:
-        logger.error(f"Error in compliance check: {exc}")
-        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+    from .services import ComplianceService
+    from apps.polls.models import Poll
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+
+    # Get objects
+    poll = Poll.objects.filter(id=poll_id).first()
+    if poll is None:
+        logger.error(f"Compliance check skipped, poll {poll_id} not found")
+        return {"status": "error", "error": f"Poll with id {poll_id} not found"}
+
+    user = User.objects.filter(id=user_id).first() if user_id else None
+
+    compliance_service = ComplianceService()
+
+    # Perform checks
+    geo_result = compliance_service.check_geographic_restrictions(
+        poll=poll,
+        ip_address=ip_address,
+        user=user
+    )
+
+    voting_result = compliance_service.check_voting_limits(
+        poll=poll,
+        user=user,
+        ip_address=ip_address
+    )
+
+    result = {
+        "status": "success",
+        "poll_id": poll_id,
+        "user_id": user_id,
+        "geographic_check": geo_result,
+        "voting_check": voting_result,
+        "overall_allowed": not (geo_result['blocked'] or voting_result['blocked'])
+    }
+
+    logger.info(
+        f"Compliance check completed for poll_id: {poll_id}, user_id: {user_id}")
+    return result
+
+
+@shared_task(bind=True, autoretry_for=RETRIABLE_ERRORS,
+             retry_kwargs={'max_retries': 3}, retry_backoff=60,
+             retry_backoff_max=600, retry_jitter=True)
+def resolve_vote_session_geo(self, session_id):
+    """Fill in a vote session's country from its IP address"""
+    from apps.polls.models import VoteSession
+    from .services import GeolocationService
+
+    pending = VoteSession.objects.filter(pk=session_id, country_code='')
+    ip_address = pending.values_list('ip_address', flat=True).first()
+    if ip_address is None:
+        return {"status": "skipped", "session_id": session_id}
+
+    location_data = GeolocationService().get_location_data(ip_address)
+    country_code = location_data.get('country_code', 'XX')
+    pending.update(country_code=country_code)
+    return {"status": "success", "session_id": session_id,
+            "country_code": country_code}
 
 
 @shared_task
@@ -109,7 +138,7 @@ def generate_compliance_report(date_from=None, date_to=None):
     """Generate compliance report for a given date range"""
     try:
         from .models import ComplianceLog
-        from django.db.models import Count
+        from django.db.models import Count, Q
 
         if not date_from:
             date_from = timezone.now() - timedelta(days=7)
@@ -122,14 +151,22 @@ def generate_compliance_report(date_from=None, date_to=None):
         )
 
         # Generate statistics
-        total_logs = queryset.count()
-        blocked_requests = queryset.filter(status='blocked').count()
-        allowed_requests = queryset.filter(status='allowed').count()
-        flagged_requests = queryset.filter(status='flagged').count()
+        counts = queryset.aggregate(
+            total=Count('id'),
+            blocked=Count('id', filter=Q(status='blocked')),
+            allowed=Count('id', filter=Q(status='allowed')),
+            flagged=Count('id', filter=Q(status='flagged')),
+        )
+        total_logs = counts['total']
+        blocked_requests = counts['blocked']
+        allowed_requests = counts['allowed']
+        flagged_requests = counts['flagged']
+
+        blocked = queryset.filter(status='blocked')
 
         # Top blocked countries
         top_blocked_countries = list(
-            queryset.filter(status='blocked')
+            blocked
             .values('country_code')
             .annotate(count=Count('id'))
             .order_by('-count')[:10]
@@ -137,7 +174,7 @@ def generate_compliance_report(date_from=None, date_to=None):
 
         # Top blocked actions
         top_blocked_actions = list(
-            queryset.filter(status='blocked')
+            blocked
             .values('action')
             .annotate(count=Count('id'))
             .order_by('-count')[:10]
@@ -176,17 +213,7 @@ def update_geolocation_data(ip_addresses):
         from .services import GeolocationService
 
         geo_service = GeolocationService()
-        updated_count = 0
-
-        for ip_address in ip_addresses:
-            try:
-                location_data = geo_service.get_location_data(ip_address)
-                if location_data and not location_data.get('cached'):
-                    updated_count += 1
-            except Exception as e:
-                logger.warning(
-                    f"Failed to update geolocation for {ip_address}: {e}")
-                continue
+        updated_count = geo_service.refresh_locations(ip_addresses)
 
         logger.info(
             f"Updated geolocation data for {updated_count} IP addresses")
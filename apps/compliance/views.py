@@ -3,6 +3,7 @@ from datetime import timedelta
 from django.http import HttpResponse
 from django.utils import timezone
 from django.db.models import Count, Q
+from django.db.models.functions import ExtractHour
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -47,7 +48,12 @@ class ComplianceLogFilter(filters.FilterSet):
 class ComplianceLogViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for compliance logs - read-only for auditing"""
 
-    queryset = ComplianceLog.objects.all().select_related('poll', 'user')
+    # Only the poll title and username are read from the joined rows
+    queryset = ComplianceLog.objects.select_related('poll', 'user').only(
+        'poll__title', 'user__username', 'ip_address', 'action', 'status',
+        'country_code', 'blocked_reason', 'metadata', 'request_path',
+        'user_agent', 'created_at'
+    )
     serializer_class = ComplianceLogSerializer
     permission_classes = [IsAdminOrStaff]
     filter_backends = [DjangoFilterBackend]
@@ -103,14 +109,22 @@ class ComplianceLogViewSet(viewsets.ReadOnlyModelViewSet):
         queryset = self.get_queryset().filter(created_at__gte=start_date)
 
         # Basic stats
-        total_logs = queryset.count()
-        blocked_requests = queryset.filter(status='blocked').count()
-        allowed_requests = queryset.filter(status='allowed').count()
-        flagged_requests = queryset.filter(status='flagged').count()
+        counts = queryset.aggregate(
+            total=Count('id'),
+            blocked=Count('id', filter=Q(status='blocked')),
+            allowed=Count('id', filter=Q(status='allowed')),
+            flagged=Count('id', filter=Q(status='flagged')),
+        )
+        total_logs = counts['total']
+        blocked_requests = counts['blocked']
+        allowed_requests = counts['allowed']
+        flagged_requests = counts['flagged']
+
+        blocked = queryset.filter(status='blocked')
 
         # Top blocked countries
         top_blocked_countries = list(
-            queryset.filter(status='blocked')
+            blocked
             .values('country_code')
             .annotate(count=Count('id'))
             .order_by('-count')[:10]
@@ -118,22 +132,28 @@ class ComplianceLogViewSet(viewsets.ReadOnlyModelViewSet):
 
         # Top blocked actions
         top_blocked_actions = list(
-            queryset.filter(status='blocked')
+            blocked
             .values('action')
             .annotate(count=Count('id'))
             .order_by('-count')[:10]
         )
 
-        # Block rate by hour
+        # Block rate by hour, from one grouped query
+        hourly = {
+            row['hour']: row
+            for row in queryset.order_by().values(
+                hour=ExtractHour('created_at')
+            ).annotate(
+                total=Count('id'),
+                blocked=Count('id', filter=Q(status='blocked'))
+            )
+        }
         block_rate_by_hour = {}
         for hour in range(24):
-            hour_logs = queryset.filter(created_at__hour=hour)
-            total_hour = hour_logs.count()
-            blocked_hour = hour_logs.filter(status='blocked').count()
-
-            if total_hour > 0:
+            row = hourly.get(hour)
+            if row and row['total'] > 0:
                 block_rate_by_hour[str(hour)] = round(
-                    (blocked_hour / total_hour) * 100, 2)
+                    (row['blocked'] / row['total']) * 100, 2)
             else:
                 block_rate_by_hour[str(hour)] = 0
 
@@ -56,7 +56,8 @@ class Command(BaseCommand):
 
                 # Create poll analytics
                 for poll in Poll.objects.all():
-                    PollAnalytics.objects.get_or_create(poll=poll)
+                    PollAnalytics.objects.get_or_create(
+                        poll=poll, defaults={'creator_id': poll.creator_id})
 
                 # Create user analytics
                 for user in User.objects.all():
@@ -1,9 +1,11 @@
 import json
 from typing import Any, Dict, Optional
 
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest, HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 
+from .renderers import dumps
+
 
 class ResponseEnvelopeMiddleware(MiddlewareMixin):
     """
@@ -32,7 +34,7 @@ class ResponseEnvelopeMiddleware(MiddlewareMixin):
                 'data': data,
                 'error': None,
             }
-            return JsonResponse(body, status=status)
+            return self._json_response(body, status)
         else:
             # Normalize error format
             error: Dict[str, Any] = {
@@ -41,4 +43,9 @@ class ResponseEnvelopeMiddleware(MiddlewareMixin):
                 'details': data,
             }
             body = {'success': False, 'data': None, 'error': error}
-            return JsonResponse(body, status=status)
+            return self._json_response(body, status)
+
+    @staticmethod
+    def _json_response(body: Dict[str, Any], status: int) -> HttpResponse:
+        return HttpResponse(
+            dumps(body), status=status, content_type='application/json')
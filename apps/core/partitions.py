@@ -0,0 +1,217 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connections, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def _month_start(value):
+    """First instant (UTC) of the month containing value"""
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _next_month(month):
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def rebuild_table(schema_editor, table, partitioned, months_ahead=2):
+    """Copy a table into a fresh one, partitioned by month or not
+
+    PostgreSQL cannot convert a table in place, so the rows move to a new
+    table which then takes over the name, indexes, foreign keys and id
+    sequence. Partitioned tables need created_at in the primary key.
+    Views selecting from the table have to be dropped around the call.
+    """
+    execute = schema_editor.execute
+    new_table = f'{table}_new'
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indexdef FROM pg_indexes '
+            'WHERE schemaname = current_schema() AND tablename = %s '
+            'AND indexname <> %s',
+            [table, f'{table}_pkey']
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT MIN(created_at) FROM {table}')
+        oldest = cursor.fetchone()[0]
+
+    execute(f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS)'
+            + (' PARTITION BY RANGE (created_at)' if partitioned else ''))
+    execute(f'ALTER TABLE {new_table} ALTER COLUMN id DROP DEFAULT')
+
+    if partitioned:
+        month = _month_start(oldest or timezone.now())
+        end = _month_start(timezone.now())
+        for _ in range(months_ahead + 1):
+            end = _next_month(end)
+        while month < end:
+            following = _next_month(month)
+            execute(
+                f'CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {new_table} '
+                f"FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{following.isoformat()}')"
+            )
+            month = following
+        # Catches rows if the monthly partitions are not created in time
+        execute(f'CREATE TABLE {table}_default PARTITION OF {new_table} DEFAULT')
+
+    execute(f'INSERT INTO {new_table} SELECT * FROM {table}')
+    execute(f'DROP TABLE {table}')
+    execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+    execute(
+        f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY '
+        + ('(id, created_at)' if partitioned else '(id)'))
+
+    for definition in indexes:
+        execute(definition)
+    for name, definition in foreign_keys:
+        execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+
+    # Identity columns are not allowed on partitioned tables before
+    # PostgreSQL 17, so ids come from an owned sequence either way
+    execute(f'CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    execute(f"SELECT setval('{table}_id_seq', "
+            f'COALESCE(MAX(id), 0) + 1, false) FROM {table}')
+    execute(f"ALTER TABLE {table} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{table}_id_seq')")
+
+
+class MonthlyPartitionManager(models.Manager):
+    """Maintains the monthly created_at partitions used on PostgreSQL
+
+    Elsewhere, and before a table is partitioned, every method is a no-op.
+    """
+
+    PARTITION_SUFFIX = '%Y_%m'
+
+    # Upper bound of a range partition, e.g.
+    # FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2024-02-01 00:00:00+00')
+    PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+    def _partitioned(self, connection):
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind = 'p' FROM pg_class "
+                "WHERE oid = to_regclass(%s)",
+                [self.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return bool(row and row[0])
+
+    def ensure_partitions(self, months_ahead: int = 2) -> int:
+        """Create this month's partition and the next few; returns created
+
+        Rows that landed in the default partition while a month was
+        missing are moved into it, since PostgreSQL refuses to create a
+        partition whose range the default partition already holds rows for.
+        """
+        connection = connections[self.db]
+        if not self._partitioned(connection):
+            return 0
+
+        table = self.model._meta.db_table
+        month = _month_start(timezone.now())
+        created = 0
+        with connection.cursor() as cursor:
+            for _ in range(months_ahead + 1):
+                following = _next_month(month)
+                name = f'{table}_{month.strftime(self.PARTITION_SUFFIX)}'
+                cursor.execute('SELECT to_regclass(%s)', [name])
+                if cursor.fetchone()[0] is None:
+                    self._create_partition(
+                        connection, cursor, name, month, following)
+                    created += 1
+                month = following
+        return created
+
+    def _create_partition(self, connection, cursor, name, start, end):
+        table = self.model._meta.db_table
+        default = f'{table}_default'
+        quote = connection.ops.quote_name
+        create = (
+            f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} '
+            f"FOR VALUES FROM ('{start.isoformat()}') "
+            f"TO ('{end.isoformat()}')"
+        )
+
+        cursor.execute('SELECT to_regclass(%s)', [default])
+        if cursor.fetchone()[0] is not None:
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM {quote(default)} '
+                f'WHERE created_at >= %s AND created_at < %s)',
+                [start, end]
+            )
+            if cursor.fetchone()[0]:
+                in_range = 'WHERE created_at >= %s AND created_at < %s'
+                with transaction.atomic(using=self.db):
+                    cursor.execute(
+                        f'ALTER TABLE {quote(table)} '
+                        f'DETACH PARTITION {quote(default)}'
+                    )
+                    cursor.execute(create)
+                    cursor.execute(
+                        f'INSERT INTO {quote(name)} '
+                        f'SELECT * FROM {quote(default)} {in_range}',
+                        [start, end]
+                    )
+                    cursor.execute(
+                        f'DELETE FROM {quote(default)} {in_range}',
+                        [start, end]
+                    )
+                    cursor.execute(
+                        f'ALTER TABLE {quote(table)} '
+                        f'ATTACH PARTITION {quote(default)} DEFAULT'
+                    )
+                return
+
+        cursor.execute(create)
+
+    def drop_partitions_before(self, cutoff) -> list:
+        """Drop partitions whose upper bound is at or before cutoff
+
+        Returns the dropped table names; the default partition has no
+        upper bound and is never dropped.
+        """
+        connection = connections[self.db]
+        if not self._partitioned(connection):
+            return []
+
+        table = self.model._meta.db_table
+        quote = connection.ops.quote_name
+        dropped = []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) '
+                'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                'WHERE i.inhparent = to_regclass(%s)',
+                [table]
+            )
+            for name, bound in cursor.fetchall():
+                match = self.PARTITION_UPPER_BOUND.search(bound or '')
+                upper = parse_datetime(match.group(1)) if match else None
+                if upper is None:
+                    continue
+                if timezone.is_naive(upper):
+                    upper = timezone.make_aware(upper, dt_timezone.utc)
+
+                if upper <= cutoff:
+                    cursor.execute(
+                        f'ALTER TABLE {quote(table)} '
+                        f'DETACH PARTITION {quote(name)}'
+                    )
+                    cursor.execute(f'DROP TABLE {quote(name)}')
+                    dropped.append(name)
+        return dropped
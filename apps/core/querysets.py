@@ -0,0 +1,34 @@
+from django.db import models, transaction
+
+# Rows removed per DELETE by the retention cleanups
+CLEANUP_BATCH_SIZE = 10000
+
+
+class BatchDeleteQuerySet(models.QuerySet):
+    def delete_in_batches(self, batch_size=CLEANUP_BATCH_SIZE):
+        """Delete matching rows in bounded batches; returns the count
+
+        Skips the deletion collector, so it is only for models nothing
+        references and no delete signal listens to.
+        """
+        deleted = 0
+        while True:
+            with transaction.atomic(using=self.db):
+                batch = list(self.order_by('pk').values_list(
+                    'pk', flat=True)[:batch_size])
+                if not batch:
+                    return deleted
+                batch_qs = self.model._base_manager.using(
+                    self.db).filter(pk__in=batch)
+                deleted += batch_qs._raw_delete(batch_qs.db)
+
+
+def upsert_unique_fields(connection, fields):
+    """unique_fields for bulk_create(update_conflicts=True) on connection
+
+    MySQL upserts on any unique key and rejects an explicit target, so
+    it gets None.
+    """
+    if connection.features.supports_update_conflicts_with_target:
+        return list(fields)
+    return None
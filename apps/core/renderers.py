@@ -0,0 +1,24 @@
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+# Datetimes go through DjangoJSONEncoder so the wire format matches
+# JsonResponse; integer dict keys (e.g. hour buckets) are allowed
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_fallback_encoder = DjangoJSONEncoder()
+
+
+def dumps(data) -> bytes:
+    """Encode data with orjson, deferring unknown types to Django"""
+    return orjson.dumps(
+        data, default=_fallback_encoder.default, option=ORJSON_OPTIONS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """DRF JSON renderer backed by orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
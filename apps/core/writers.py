@@ -0,0 +1,104 @@
+import atexit
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def write_rows(rows, write, label):
+    """Write rows one savepoint each; returns the rows that failed
+
+    The savepoints keep a failing row from poisoning any transaction the
+    caller is in.
+    """
+    failed = []
+    for row in rows:
+        try:
+            with transaction.atomic():
+                write([row])
+        except Exception as e:
+            logger.error(f"Error writing {label}: {e}")
+            failed.append(row)
+    return failed
+
+
+def write_batch(rows, write, label):
+    """Write rows in one batch, falling back to one row at a time
+
+    Whatever sinks the batch, be it a bad row or a dropped connection,
+    only rows failing on their own are lost; those are returned.
+    """
+    try:
+        with transaction.atomic():
+            write(rows)
+        return []
+    except Exception as e:
+        logger.warning(f"Batch {label} write failed, retrying row by row: {e}")
+    return write_rows(rows, write, label)
+
+
+class BatchWriter:
+    """Writes queued rows from a daemon thread in bounded batches
+
+    write takes a list of rows. The thread starts with the first put(),
+    and whatever is still queued is written when the process exits;
+    rows queued in a worker that is killed outright are lost.
+    """
+
+    def __init__(self, name, write, label, maxsize=10000, batch_size=500):
+        self.name = name
+        self.label = label
+        self._write = write
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._batch_size = batch_size
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, row) -> bool:
+        """Queue a row; False when the queue is full, leaving it to the caller"""
+        self._start()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            return False
+
+    def write(self, rows) -> list:
+        """Write rows on the calling thread; returns the rows that failed"""
+        return write_batch(rows, self._write, self.label)
+
+    def drain(self, block=True) -> int:
+        """Write up to one batch of queued rows; returns the batch size"""
+        try:
+            batch = [self._queue.get(block=block)]
+        except queue.Empty:
+            return 0
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        self.write(batch)
+        return len(batch)
+
+    def flush(self):
+        """Write whatever is still queued"""
+        while self.drain(block=False):
+            pass
+
+    def _run(self):
+        while True:
+            self.drain()
+            close_old_connections()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
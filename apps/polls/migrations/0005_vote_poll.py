@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-15 22:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_vote_poll(apps, schema_editor):
+    Vote = apps.get_model('polls', 'Vote')
+    Choice = apps.get_model('polls', 'Choice')
+    Vote.objects.using(schema_editor.connection.alias).filter(
+        poll__isnull=True
+    ).update(poll=Subquery(
+        Choice.objects.filter(pk=OuterRef('choice_id')).values(
+            'question__poll_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_alter_bookmark_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='poll',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='polls.poll'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['poll', 'created_at'], name='polls_vote_poll_id_579149_idx'),
+        ),
+        migrations.RunPython(backfill_vote_poll, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-15 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_vote_poll'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='votesession',
+            name='country_code',
+            field=models.CharField(blank=True, max_length=2),
+        ),
+    ]
@@ -80,6 +80,8 @@ class VoteSession(models.Model):
     poll = models.ForeignKey(
         Poll, on_delete=models.CASCADE, related_name='vote_sessions')
     ip_address = models.GenericIPAddressField()
+    # Filled in from ip_address after the vote, by the compliance app
+    country_code = models.CharField(max_length=2, blank=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
         null=True, blank=True, related_name='vote_sessions')
@@ -97,9 +99,23 @@ class VoteSession(models.Model):
 class Vote(models.Model):
     choice = models.ForeignKey(
         Choice, on_delete=models.CASCADE, related_name='votes')
+    # Denormalized from choice.question.poll so per-poll queries skip two joins
+    poll = models.ForeignKey(
+        Poll, on_delete=models.CASCADE, related_name='votes',
+        null=True, editable=False)
     ip_address = models.GenericIPAddressField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['poll', 'created_at']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.poll_id is None:
+            self.poll = self.choice.question.poll
+        super().save(*args, **kwargs)
+
 
 class Bookmark(models.Model):
     user = models.ForeignKey(
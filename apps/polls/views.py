@@ -102,7 +102,7 @@ class VoteView(generics.CreateAPIView):
         choice = serializer.validated_data['choice']
         poll = choice.question.poll
 
-        vote = serializer.save(ip_address=ip_address)
+        vote = serializer.save(ip_address=ip_address, poll=poll)
         VoteSession.objects.create(poll=poll, ip_address=ip_address)
         Choice.objects.filter(pk=choice.pk).update(
             vote_count=F('vote_count') + 1)
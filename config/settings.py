@@ -36,6 +36,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.gzip.GZipMiddleware',  # Above anything writing the body
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -119,6 +120,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
@@ -166,6 +171,13 @@ else:
         }
     }
 
+# Without Redis, write analytics events from a background thread in batches
+ANALYTICS_ASYNC_EVENTS = os.environ.get('ANALYTICS_ASYNC_EVENTS') == '1'
+
+# Write per-request compliance logs from a background thread in batches;
+# anything still queued is lost if the worker is killed, so this is opt-in
+COMPLIANCE_ASYNC_LOGS = os.environ.get('COMPLIANCE_ASYNC_LOGS') == '1'
+
 # Session configuration for PythonAnywhere
 SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_CACHE_ALIAS = 'default'
@@ -238,6 +250,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.analytics.tasks.aggregate_hourly_analytics',
         'schedule': 3600.0,  # Every hour
     },
+    'flush-analytics-events-2s': {
+        'task': 'apps.analytics.tasks.flush_analytics_events',
+        'schedule': 2.0,  # Every 2 seconds
+    },
+    'refresh-recent-events-5min': {
+        'task': 'apps.analytics.tasks.refresh_recent_analytics_events',
+        'schedule': 300.0,  # Every 5 minutes
+    },
+    'reconcile-poll-counters-15min': {
+        'task': 'apps.analytics.tasks.reconcile_poll_counters',
+        'schedule': 900.0,  # Every 15 minutes
+    },
+    'reconcile-table-counters-daily': {
+        'task': 'apps.analytics.tasks.reconcile_table_counters',
+        'schedule': 86400.0,  # Every day
+    },
     'cleanup-old-events-daily': {
         'task': 'apps.analytics.tasks.cleanup_old_analytics_events',
         'schedule': 86400.0,  # Every day
@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+LOCMEM_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@pytest.fixture
+def locmem_cache():
+    """An empty in-process cache in place of the database cache table"""
+    with override_settings(CACHES=LOCMEM_CACHE):
+        cache.clear()
+        yield cache
+        cache.clear()
@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.analytics.models import (
+    AnalyticsEvent, PollAnalytics, RecentAnalyticsEvent, UserAnalytics
+)
+from apps.analytics.services import AnalyticsService, POLL_COUNTER_KEY
+from apps.compliance.models import ComplianceLog
+from apps.polls.models import Poll, Question, Choice, Vote, VoteSession, Bookmark
+
+User = get_user_model()
+
+pytestmark = pytest.mark.usefixtures('locmem_cache')
+
+
+@pytest.fixture
+def creator(db):
+    return User.objects.create_user(
+        username='creator', email='creator@example.com', password='testpass123')
+
+
+@pytest.fixture
+def voter(db):
+    return User.objects.create_user(
+        username='voter', email='voter@example.com', password='testpass123')
+
+
+def make_poll(creator, title, votes):
+    """A poll with one required question and votes from distinct IPs"""
+    poll = Poll.objects.create(title=title, creator=creator)
+    question = Question.objects.create(poll=poll, text='Q', is_required=True)
+    choices = [Choice.objects.create(question=question, text=text)
+               for text in ('A', 'B')]
+    for i in range(votes):
+        ip_address = f'10.0.0.{i + 1}'
+        VoteSession.objects.create(poll=poll, ip_address=ip_address)
+        Vote.objects.create(choice=choices[i % 2], ip_address=ip_address)
+    return poll
+
+
+def analytics_values(poll_ids):
+    fields = [field for field in AnalyticsService.POLL_ANALYTICS_FIELDS
+              if field not in ('last_calculated', 'last_updated')]
+    return {
+        row['poll_id']: row for row in
+        PollAnalytics.objects.filter(poll_id__in=poll_ids).values(
+            'poll_id', *fields)
+    }
+
+
+@pytest.mark.django_db
+def test_partition_maintenance_is_a_noop_off_postgresql():
+    now = timezone.now()
+    for model in (AnalyticsEvent, ComplianceLog):
+        assert model.objects.ensure_partitions() == 0
+        assert model.objects.drop_partitions_before(now) == []
+    assert RecentAnalyticsEvent.objects.refresh() is None
+
+
+@pytest.mark.django_db
+def test_bulk_poll_analytics_match_per_poll(creator, voter):
+    polls = [make_poll(creator, 'First', votes=3),
+             make_poll(creator, 'Second', votes=1)]
+    Bookmark.objects.create(user=voter, poll=polls[0])
+    poll_ids = [poll.id for poll in polls]
+    service = AnalyticsService()
+
+    for poll_id in poll_ids:
+        assert service.update_poll_analytics(poll_id=poll_id)
+    per_poll = analytics_values(poll_ids)
+
+    PollAnalytics.objects.filter(poll_id__in=poll_ids).delete()
+    assert service.update_poll_analytics(poll_ids=poll_ids)
+
+    assert analytics_values(poll_ids) == per_poll
+    assert per_poll[polls[0].id]['total_votes'] == 3
+    assert per_poll[polls[0].id]['bookmark_count'] == 1
+
+
+@pytest.mark.django_db
+def test_poll_counters_seed_then_increment(
+        creator, voter, django_capture_on_commit_callbacks):
+    poll = make_poll(creator, 'Counted', votes=2)
+    service = AnalyticsService()
+
+    # Seeded from the database on first read
+    counters = service.get_poll_counters(poll.id)
+    assert counters['votes'] == 2
+    assert counters['bookmarks'] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        bookmark = Bookmark.objects.create(user=voter, poll=poll)
+    assert service.get_poll_counters(poll.id)['bookmarks'] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        bookmark.delete()
+    assert service.get_poll_counters(poll.id)['bookmarks'] == 0
+
+
+@pytest.mark.django_db
+def test_reconcile_overwrites_drifted_counters(creator):
+    poll = make_poll(creator, 'Drifted', votes=2)
+    service = AnalyticsService()
+    cache.set(POLL_COUNTER_KEY.format(poll_id=poll.id, counter='votes'), 99)
+
+    assert service.reconcile_poll_counters([poll.id]) == 1
+    assert service.get_poll_counters(poll.id)['votes'] == 2
+
+
+@pytest.mark.django_db
+def test_user_refresh_goes_through_update_metrics(creator, voter):
+    poll = make_poll(creator, 'Mine', votes=2)
+    Bookmark.objects.create(user=voter, poll=poll)
+
+    assert AnalyticsService().update_user_analytics(creator.id)
+    assert AnalyticsService().update_user_analytics(voter.id)
+
+    created = UserAnalytics.objects.get(user=creator)
+    assert created.polls_created == 1
+    assert created.total_votes_received == 2
+    assert created.last_calculated is not None
+    assert UserAnalytics.objects.get(user=voter).bookmarks_made == 1
@@ -0,0 +1,92 @@
+import json
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+from django.utils import timezone
+
+from apps.analytics.models import AnalyticsEvent
+from apps.analytics.services import (
+    AnalyticsService, EVENT_BUFFER_KEY, EVENT_DEAD_LETTER_KEY
+)
+
+
+class FakeRedisList:
+    """The few list commands flush_event_buffer uses, kept in memory"""
+
+    def __init__(self):
+        self.lists = {}
+        self._pipeline = []
+
+    def pipeline(self):
+        self._pipeline = []
+        return self
+
+    def execute(self):
+        results = [command() for command in self._pipeline]
+        self._pipeline = []
+        return results
+
+    def lrange(self, key, start, end):
+        self._pipeline.append(
+            lambda: list(self.lists.get(key, [])[start:end + 1]))
+
+    def ltrim(self, key, start, end):
+        def trim():
+            self.lists[key] = self.lists.get(key, [])[start:]
+        self._pipeline.append(trim)
+
+    def lpush(self, key, *values):
+        for value in values:
+            self.lists.setdefault(key, []).insert(0, value)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+
+def buffer_entry(**overrides):
+    entry = {column: None for column in AnalyticsEvent.COPY_COLUMNS}
+    entry.update(event_type='poll_view', ip_address='10.0.0.1',
+                 user_agent='', device_type='unknown', country_code='',
+                 region='', city='', metadata={},
+                 created_at=timezone.now().isoformat())
+    entry.update(overrides)
+    return json.dumps(entry)
+
+
+def strict_bulk_log(events, bulk_log=AnalyticsEvent.bulk_log):
+    """bulk_log rejecting NULL IPs the way PostgreSQL does
+
+    SQLite's INSERT OR IGNORE would silently skip the row instead.
+    """
+    if any(event['ip_address'] is None for event in events):
+        raise IntegrityError('null value in column "ip_address"')
+    return bulk_log(events)
+
+
+@pytest.mark.django_db
+def test_bad_buffered_row_does_not_block_the_rest():
+    buffer = FakeRedisList()
+    bad = buffer_entry(ip_address=None)
+    unreadable = 'not json'
+    buffer.rpush(EVENT_BUFFER_KEY, buffer_entry(), bad, unreadable,
+                 buffer_entry(ip_address='10.0.0.2'))
+
+    service = AnalyticsService()
+    with mock.patch.object(service, '_event_buffer', return_value=buffer), \
+            mock.patch.object(AnalyticsEvent, 'bulk_log',
+                              side_effect=strict_bulk_log):
+        assert service.flush_event_buffer() == 2
+
+    assert sorted(AnalyticsEvent.objects.values_list(
+        'ip_address', flat=True)) == ['10.0.0.1', '10.0.0.2']
+    assert buffer.lists[EVENT_BUFFER_KEY] == []
+    assert buffer.lists[EVENT_DEAD_LETTER_KEY] == [unreadable, bad]
+
+
+@pytest.mark.django_db
+def test_events_without_a_client_ip_are_recorded():
+    event = AnalyticsService().track_event(event_type='user_register')
+
+    assert event is not None and event.pk is not None
+    assert AnalyticsEvent.objects.get(pk=event.pk).ip_address == '0.0.0.0'
@@ -0,0 +1,95 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.compliance.middleware import (
+    ComplianceLoggingMiddleware, GeoRestrictionMiddleware
+)
+from apps.compliance.models import ComplianceLog
+from apps.compliance.services import ComplianceService
+from apps.polls.models import Poll
+
+User = get_user_model()
+
+pytestmark = pytest.mark.usefixtures('locmem_cache')
+
+
+@pytest.fixture(autouse=True)
+def sync_logs(settings):
+    settings.COMPLIANCE_ASYNC_LOGS = False
+
+
+@pytest.fixture
+def poll(db):
+    creator = User.objects.create_user(
+        username='creator', email='creator@example.com', password='testpass123')
+    return Poll.objects.create(title='Geo poll', creator=creator)
+
+
+@pytest.mark.django_db
+def test_request_logs_are_written_at_response_time():
+    request = RequestFactory().get('/api/v1/polls/')
+    request.user = AnonymousUser()
+    middleware = ComplianceLoggingMiddleware(lambda request: HttpResponse())
+
+    middleware.process_request(request)
+    middleware.compliance_service.log_compliance_action(
+        action='geo_check', ip_address='127.0.0.1', status='allowed')
+    assert ComplianceLog.objects.count() == 0
+
+    middleware.process_response(request, HttpResponse())
+    assert sorted(ComplianceLog.objects.values_list('action', flat=True)) == [
+        'geo_check', 'request_allowed']
+
+
+@pytest.mark.django_db
+def test_batch_failure_keeps_the_good_rows():
+    service = ComplianceService()
+    service.start_request()
+    service.log_compliance_action(
+        action='geo_check', ip_address='127.0.0.1', status='allowed')
+    # NOT NULL violation: fails the batch insert and then its own row
+    service.log_compliance_action(
+        action=None, ip_address='127.0.0.2', status='allowed')
+    service.log_compliance_action(
+        action='vote_limit', ip_address='127.0.0.3', status='blocked')
+    service.finish_request()
+
+    assert sorted(ComplianceLog.objects.values_list('action', flat=True)) == [
+        'geo_check', 'vote_limit']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('kwarg', ['poll_id', 'pk'])
+def test_geo_restriction_reads_poll_from_view_kwargs(poll, kwarg):
+    request = RequestFactory().post(f'/api/v1/polls/{poll.id}/vote/')
+    request.user = AnonymousUser()
+    middleware = GeoRestrictionMiddleware(lambda request: HttpResponse())
+    service = middleware.compliance_service
+
+    with mock.patch.object(
+            service, 'check_geographic_restrictions',
+            return_value={'blocked': False, 'country_code': 'US'}) as geo, \
+            mock.patch.object(service, 'check_voting_limits',
+                              return_value={'blocked': False}):
+        assert middleware.process_view(
+            request, None, (), {kwarg: poll.id}) is None
+
+    assert geo.call_args.kwargs['poll'].id == poll.id
+    assert request.compliance_data['country_code'] == 'US'
+
+
+@pytest.mark.django_db
+def test_geo_restriction_skips_reads(poll):
+    request = RequestFactory().get(f'/api/v1/polls/{poll.id}/')
+    middleware = GeoRestrictionMiddleware(lambda request: HttpResponse())
+
+    with mock.patch.object(middleware.compliance_service,
+                           'check_geographic_restrictions') as geo:
+        assert middleware.process_view(
+            request, None, (), {'pk': poll.id}) is None
+    geo.assert_not_called()